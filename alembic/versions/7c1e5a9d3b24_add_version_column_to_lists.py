@@ -0,0 +1,33 @@
+"""Add version column to lists
+
+Revision ID: 7c1e5a9d3b24
+Revises: 3a4dbb9b2f7a
+Create Date: 2026-10-18 10:12:31.504112
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1e5a9d3b24"
+down_revision: Union[str, Sequence[str], None] = "3a4dbb9b2f7a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("lists") as batch_op:
+        batch_op.add_column(
+            sa.Column("version", sa.Integer(), server_default="0", nullable=False)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("lists") as batch_op:
+        batch_op.drop_column("version")
@@ -0,0 +1,58 @@
+"""Add full-text search index of item names
+
+Creates the FTS5 table items_fts with the triggers that keep it in sync with
+items, and indexes the existing items. SQLite only; other databases search
+with LIKE.
+
+Revision ID: 9d2b6f4e8a13
+Revises: e4a7c2d91f58
+Create Date: 2026-10-18 18:22:45.610938
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d2b6f4e8a13"
+down_revision: Union[str, Sequence[str], None] = "e4a7c2d91f58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE items_fts USING fts5("
+        "name, content='items', content_rowid='id', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER items_fts_insert AFTER INSERT ON items BEGIN "
+        "INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name); END"
+    )
+    op.execute(
+        "CREATE TRIGGER items_fts_delete AFTER DELETE ON items BEGIN "
+        "INSERT INTO items_fts(items_fts, rowid, name) "
+        "VALUES ('delete', old.id, old.name); END"
+    )
+    op.execute(
+        "CREATE TRIGGER items_fts_update AFTER UPDATE OF name ON items BEGIN "
+        "INSERT INTO items_fts(items_fts, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name); END"
+    )
+    op.execute("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("DROP TRIGGER items_fts_update")
+    op.execute("DROP TRIGGER items_fts_delete")
+    op.execute("DROP TRIGGER items_fts_insert")
+    op.execute("DROP TABLE items_fts")
@@ -0,0 +1,38 @@
+"""Consolidate item indexes
+
+Drops ix_item_name, which no query filters on by itself, and renames
+ix_item_list_id (left over from before the item table was renamed) to
+ix_items_list_id. Lookups of an item by list and name are served by the index
+of the uq_item_list_name constraint, and lookups of a list by name by the
+index of its unique constraint.
+
+Revision ID: b5f83e2c6d17
+Revises: 7c1e5a9d3b24
+Create Date: 2026-10-18 14:03:52.918274
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5f83e2c6d17"
+down_revision: Union[str, Sequence[str], None] = "7c1e5a9d3b24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index("ix_item_name", table_name="items")
+    op.drop_index("ix_item_list_id", table_name="items")
+    op.create_index("ix_items_list_id", "items", ["list_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_items_list_id", table_name="items")
+    op.create_index("ix_item_list_id", "items", ["list_id"], unique=False)
+    op.create_index("ix_item_name", "items", ["name"], unique=False)
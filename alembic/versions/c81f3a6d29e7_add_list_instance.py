@@ -0,0 +1,38 @@
+"""Add list instance
+
+Adds a random identifier given to every list when it is created, which keeps a
+list that was deleted and created again (SQLite reuses its id, and its version
+starts again at 0) from matching the ETags of the old one. Existing lists get
+0; lists created from now on never do.
+
+Revision ID: c81f3a6d29e7
+Revises: 9d2b6f4e8a13
+Create Date: 2026-10-18 21:07:12.448301
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c81f3a6d29e7"
+down_revision: Union[str, Sequence[str], None] = "9d2b6f4e8a13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("lists") as batch_op:
+        batch_op.add_column(
+            sa.Column("instance", sa.Integer(), server_default="0", nullable=False)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("lists") as batch_op:
+        batch_op.drop_column("instance")
@@ -0,0 +1,76 @@
+"""Track item changes for delta sync
+
+Adds the version of each item's last change, tombstones for deleted items and
+the version up to which a list's tombstones were compacted. Existing items get
+their list's current version.
+
+Revision ID: e4a7c2d91f58
+Revises: b5f83e2c6d17
+Create Date: 2026-10-18 16:41:07.283519
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a7c2d91f58"
+down_revision: Union[str, Sequence[str], None] = "b5f83e2c6d17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("lists") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "compacted_version", sa.Integer(), server_default="0", nullable=False
+            )
+        )
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.add_column(
+            sa.Column("version", sa.Integer(), server_default="0", nullable=False)
+        )
+    op.execute(
+        "UPDATE items SET version = "
+        "(SELECT lists.version FROM lists WHERE lists.id = items.list_id)"
+    )
+
+    op.create_table(
+        "item_tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("list_id", sa.Integer(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["list_id"], ["lists.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_item_tombstones_list_version",
+        "item_tombstones",
+        ["list_id", "version"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_item_tombstones_deleted_at",
+        "item_tombstones",
+        ["deleted_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_item_tombstones_deleted_at", table_name="item_tombstones")
+    op.drop_index("ix_item_tombstones_list_version", table_name="item_tombstones")
+    op.drop_table("item_tombstones")
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.drop_column("version")
+    with op.batch_alter_table("lists") as batch_op:
+        batch_op.drop_column("compacted_version")
@@ -0,0 +1,100 @@
+"""
+Time and memory it takes to delete a large list.
+
+Compares the ORM cascade (load the list and all its items into the session,
+then delete them row by row) with the single DELETE that leaves the items to
+the database's ON DELETE CASCADE, on a fresh database file per strategy:
+
+    uv run python benchmarks/delete_list.py --items 50000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, insert  # noqa: E402
+from sqlalchemy.orm import selectinload  # noqa: E402
+from sqlmodel import select  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from eggs.db import ItemModel, ListModel, create_db_engine, init_db  # noqa: E402
+
+
+async def orm_cascade(db: AsyncSession) -> None:
+    """The previous behaviour of delete_list."""
+    list_obj = (
+        await db.exec(
+            select(ListModel)
+            .where(ListModel.name == "big")
+            .options(selectinload(ListModel.items))
+        )
+    ).one()
+    for item in list_obj.items:
+        await db.delete(item)
+    await db.delete(list_obj)
+    await db.commit()
+
+
+async def database_cascade(db: AsyncSession) -> None:
+    """What delete_list does now."""
+    await db.exec(
+        delete(ListModel)
+        .where(ListModel.name == "big")
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+STRATEGIES = {"orm": orm_cascade, "cascade": database_cascade}
+
+
+async def run(strategy: str, items: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(init_db)
+            await conn.execute(insert(ListModel), [{"name": "big"}])
+            await conn.execute(
+                insert(ItemModel),
+                [
+                    {"list_id": 1, "name": f"item-{n}", "is_in_cart": False}
+                    for n in range(items)
+                ],
+            )
+
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            tracemalloc.start()
+            start = time.perf_counter()
+            await STRATEGIES[strategy](db)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            remaining = (await db.exec(select(func.count(ItemModel.id)))).one()
+        await engine.dispose()
+
+    assert remaining == 0, f"{remaining} items left behind"
+    return {
+        "strategy": strategy,
+        "items": items,
+        "seconds": round(elapsed, 3),
+        "peak_memory_mb": round(peak / 2**20, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=50000)
+    args = parser.parse_args()
+
+    for strategy in STRATEGIES:
+        print(asyncio.run(run(strategy, args.items)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Load and latency benchmark for the HTTP API.
+
+Seeds a SQLite database, boots eggs.api:app under uvicorn and drives a mixed
+read/write workload with concurrent clients. Throughput and p50/p95/p99
+latency per endpoint are written to a JSON file:
+
+    uv run python benchmarks/http_load.py --lists 50 --items 200 \\
+        --concurrency 32 --duration 20 --output before.json
+
+Two runs can be compared; regressions beyond the threshold are listed and make
+the command exit with status 1:
+
+    uv run python benchmarks/http_load.py --compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from eggs.db import ItemModel, ListModel, create_db_engine, init_db  # noqa: E402
+
+# Relative frequency of each operation in the workload
+DEFAULT_MIX = "browse=40,get_item=25,toggle=20,create=10,delete=5"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    if not samples:
+        return 0.0
+    index = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+async def seed(url: str, lists: int, items: int) -> None:
+    engine = create_db_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(init_db)
+        await conn.execute(
+            insert(ListModel), [{"name": f"list-{n}"} for n in range(lists)]
+        )
+        await conn.execute(
+            insert(ItemModel),
+            [
+                {"list_id": list_id, "name": f"item-{n}", "is_in_cart": False}
+                for list_id in range(1, lists + 1)
+                for n in range(items)
+            ],
+        )
+    await engine.dispose()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, port: int, workers: int) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "eggs.api:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+
+
+async def wait_until_healthy(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/api/v1/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not become healthy")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def call(self, endpoint: str, request) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[endpoint] += 1
+            return None
+        self.latencies[endpoint].append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+        return response
+
+
+async def client_loop(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    worker: int,
+    args: argparse.Namespace,
+    mix: dict[str, int],
+    deadline: float,
+) -> None:
+    rng = random.Random(worker)
+    operations, weights = zip(*mix.items())
+    created: list[tuple[str, str]] = []
+    counter = 0
+
+    while time.monotonic() < deadline:
+        list_name = f"list-{rng.randrange(args.lists)}"
+        operation = rng.choices(operations, weights)[0]
+
+        if operation == "browse":
+            await recorder.call("GET /lists/", client.get("/api/v1/lists/"))
+            await recorder.call(
+                "GET /lists/{list}/items/",
+                client.get(f"/api/v1/lists/{list_name}/items/"),
+            )
+        elif operation == "get_item":
+            item = f"item-{rng.randrange(args.items)}"
+            await recorder.call(
+                "GET /lists/{list}/items/{item}",
+                client.get(f"/api/v1/lists/{list_name}/items/{item}"),
+            )
+        elif operation == "toggle":
+            item = f"item-{rng.randrange(args.items)}"
+            await recorder.call(
+                "PUT /lists/{list}/items/{item}",
+                client.put(
+                    f"/api/v1/lists/{list_name}/items/{item}",
+                    json={"is_in_cart": rng.random() < 0.5},
+                ),
+            )
+        elif operation == "create":
+            counter += 1
+            item = f"w{worker}-{counter}"
+            response = await recorder.call(
+                "POST /lists/{list}/items/{item}",
+                client.post(f"/api/v1/lists/{list_name}/items/{item}"),
+            )
+            if response is not None and response.status_code == 200:
+                created.append((list_name, item))
+        elif operation == "delete" and created:
+            list_name, item = created.pop(rng.randrange(len(created)))
+            await recorder.call(
+                "DELETE /lists/{list}/items/{item}",
+                client.delete(f"/api/v1/lists/{list_name}/items/{item}"),
+            )
+
+
+def summarize(recorder: Recorder, elapsed: float, args: argparse.Namespace) -> dict:
+    endpoints = {}
+    for endpoint, samples in sorted(recorder.latencies.items()):
+        samples.sort()
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "errors": recorder.errors[endpoint],
+            "throughput_rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 50), 2),
+            "p95_ms": round(percentile(samples, 95), 2),
+            "p99_ms": round(percentile(samples, 99), 2),
+        }
+    total = sum(len(samples) for samples in recorder.latencies.values())
+    return {
+        "config": {
+            "lists": args.lists,
+            "items": args.items,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "workers": args.workers,
+            "mix": args.mix,
+        },
+        "total_throughput_rps": round(total / elapsed, 1),
+        "endpoints": endpoints,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    mix = {
+        name: int(weight)
+        for name, weight in (part.split("=") for part in args.mix.split(","))
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{tmp}/bench.db"
+        await seed(f"sqlite+aiosqlite:///{tmp}/bench.db", args.lists, args.items)
+
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(database_url, port, args.workers)
+        try:
+            await wait_until_healthy(base_url)
+            recorder = Recorder()
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+                start = time.monotonic()
+                deadline = start + args.duration
+                await asyncio.gather(
+                    *(
+                        client_loop(client, recorder, worker, args, mix, deadline)
+                        for worker in range(args.concurrency)
+                    )
+                )
+                elapsed = time.monotonic() - start
+        finally:
+            server.terminate()
+            server.wait()
+
+    return summarize(recorder, elapsed, args)
+
+
+def compare(before_path: str, after_path: str, threshold: float) -> int:
+    """Print per-endpoint deltas and return the number of regressions."""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+
+    regressions = 0
+    for endpoint, new in after["endpoints"].items():
+        old = before["endpoints"].get(endpoint)
+        if old is None:
+            continue
+        for metric, higher_is_worse in (
+            ("throughput_rps", False),
+            ("p50_ms", True),
+            ("p95_ms", True),
+            ("p99_ms", True),
+        ):
+            if not old[metric]:
+                continue
+            change = (new[metric] - old[metric]) / old[metric] * 100
+            regressed = change > threshold if higher_is_worse else -change > threshold
+            regressions += regressed
+            print(
+                f"{'REGRESSION' if regressed else 'ok':10} {endpoint:35} {metric:15} "
+                f"{old[metric]:>9} -> {new[metric]:>9} ({change:+.1f}%)"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lists", type=int, default=20)
+    parser.add_argument("--items", type=int, default=100, help="items per list")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two runs"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="regression threshold in %%"
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        regressions = compare(*args.compare, args.threshold)
+        print(f"{regressions} regression(s) beyond {args.threshold}%")
+        sys.exit(1 if regressions else 0)
+
+    result = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Latency of item search through the FTS5 index versus a LIKE scan.
+
+Fills a fresh database file with items named from a small vocabulary, then
+times a page of results for common and rare words both ways:
+
+    uv run python benchmarks/search.py --items 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+from sqlmodel import select  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from eggs.db import ItemModel, ListModel, create_db_engine, init_db  # noqa: E402
+from eggs.search import search_items, search_terms  # noqa: E402
+
+WORDS = (
+    "milk eggs bread butter cheese apple banana orange coffee tea rice pasta "
+    "tomato onion garlic pepper salt sugar flour yogurt chicken beef fish soap"
+).split()
+# (query, description): words in most names, a prefix, and a word in none
+QUERIES = [("milk", "common"), ("ban", "prefix"), ("choc", "rare")]
+LISTS = 1000
+BATCH = 50000
+PAGE = 100
+
+
+async def populate(engine, items: int) -> None:
+    rng = random.Random(0)
+    async with engine.begin() as conn:
+        await conn.run_sync(init_db)
+        await conn.execute(
+            insert(ListModel), [{"name": f"list-{n}"} for n in range(LISTS)]
+        )
+    for start in range(0, items, BATCH):
+        rows = [
+            {
+                "list_id": n % LISTS + 1,
+                "name": f"{' '.join(rng.sample(WORDS, 3))} {n}",
+                "is_in_cart": False,
+            }
+            for n in range(start, min(start + BATCH, items))
+        ]
+        async with engine.begin() as conn:
+            await conn.execute(insert(ItemModel), rows)
+    # The one item the rare query finds, last, so a LIKE scan reads every row
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(ItemModel),
+            [{"list_id": 1, "name": "chocolate", "is_in_cart": False}],
+        )
+
+
+async def like(db: AsyncSession, q: str) -> list:
+    """The LIKE scan search would otherwise need."""
+    statement = (
+        select(ItemModel.id, ItemModel.name)
+        .where(*(ItemModel.name.like(f"%{term}%") for term in search_terms(q)))
+        .order_by(ItemModel.id)
+        .limit(PAGE)
+    )
+    return (await db.exec(statement)).all()
+
+
+async def fts(db: AsyncSession, q: str) -> list:
+    return await search_items(db, search_terms(q), 0, PAGE)
+
+
+async def timed(db: AsyncSession, strategy, q: str, repeat: int) -> tuple[float, int]:
+    rows = await strategy(db, q)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await strategy(db, q)
+    return (time.perf_counter() - start) / repeat, len(rows)
+
+
+async def run(items: int, repeat: int) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        start = time.perf_counter()
+        await populate(engine, items)
+        print(f"populated {items} items in {time.perf_counter() - start:.1f}s")
+
+        async with AsyncSession(engine) as db:
+            for q, kind in QUERIES:
+                for name, strategy in (("like", like), ("fts", fts)):
+                    seconds, found = await timed(db, strategy, q, repeat)
+                    results.append(
+                        {
+                            "query": q,
+                            "kind": kind,
+                            "strategy": name,
+                            "found": found,
+                            "ms": round(seconds * 1000, 2),
+                        }
+                    )
+        await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for result in asyncio.run(run(args.items, args.repeat)):
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-request CPU time of the read endpoints on a large list.
+
+Seeds a list with --items items in a temporary SQLite database and calls the
+app in-process (no network, no server), so the numbers are dominated by the
+handler, the query and response serialization:
+
+    uv run python benchmarks/serialization.py --items 10000 --requests 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TMP = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{TMP}/bench.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from eggs.api import app  # noqa: E402
+from eggs.db import ItemModel, ListModel, engine, init_db  # noqa: E402
+
+
+async def seed(items: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(init_db)
+        await conn.execute(insert(ListModel), [{"name": "big"}])
+        await conn.execute(
+            insert(ItemModel),
+            [
+                {"list_id": 1, "name": f"item {n}", "is_in_cart": n % 2 == 0}
+                for n in range(items)
+            ],
+        )
+
+
+async def measure(client: httpx.AsyncClient, url: str, requests: int) -> dict:
+    await client.get(url)  # warm up
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(url)
+        assert response.status_code == 200, response.text
+    return {
+        "url": url,
+        "cpu_ms_per_request": round((time.process_time() - cpu) * 1000 / requests, 3),
+        "wall_ms_per_request": round(
+            (time.perf_counter() - wall) * 1000 / requests, 3
+        ),
+    }
+
+
+async def run(items: int, requests: int) -> None:
+    await seed(items)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://eggs") as client:
+        for url in (
+            "/api/v1/lists/big/items/item 5000",
+            "/api/v1/lists/big/items/?limit=1000",
+            "/api/v1/lists/big?include=items",
+        ):
+            print(await measure(client, url, requests))
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Write throughput of the SQLite engine with and without the performance profile.
+
+Runs a number of concurrent writers, each creating items in its own list and
+committing every insert, against a fresh database file per profile:
+
+    uv run python benchmarks/sqlite_writes.py --writers 8 --items 250
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from eggs.db import ItemModel, ListModel, create_db_engine, init_db  # noqa: E402
+
+
+async def writer(engine, index: int, items: int) -> int:
+    """Create a list and insert `items` items into it, one commit each."""
+    errors = 0
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        list_obj = ListModel(name=f"list-{index}")
+        db.add(list_obj)
+        await db.commit()
+        for n in range(items):
+            try:
+                db.add(ItemModel(name=f"item-{n}", list_id=list_obj.id))
+                await db.commit()
+            except OperationalError:
+                # "database is locked"
+                await db.rollback()
+                errors += 1
+    return errors
+
+
+async def run(profile: str, writers: int, items: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(
+            f"sqlite+aiosqlite:///{tmp}/bench.db", sqlite_profile=profile
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(init_db)
+
+        start = time.perf_counter()
+        errors = await asyncio.gather(
+            *(writer(engine, i, items) for i in range(writers))
+        )
+        elapsed = time.perf_counter() - start
+        await engine.dispose()
+
+    total = writers * items - sum(errors)
+    return {
+        "profile": profile,
+        "commits": total,
+        "errors": sum(errors),
+        "seconds": round(elapsed, 3),
+        "commits_per_second": round(total / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--items", type=int, default=250)
+    args = parser.parse_args()
+
+    for profile in ("default", "performance"):
+        print(asyncio.run(run(profile, args.writers, args.items)))
+
+
+if __name__ == "__main__":
+    main()
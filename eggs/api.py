@@ -1,26 +1,115 @@
 # Standard library imports
+import argparse
+import asyncio
+import base64
+import heapq
+import importlib.util
+import itertools
 import os
 import logging
+import tempfile
+from contextlib import asynccontextmanager
 
 # Third-party imports
 import uvicorn
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import Body, FastAPI, Header, HTTPException, Depends, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import select, Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel, Field
-from typing import Annotated
+from typing import Annotated, Any, Literal, Optional
 
 # Local imports
-from eggs.db import get_db, ListModel, ItemModel
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+from eggs.batching import WriteBatcher, batchers, get_batcher, run_write
+from eggs.cache import list_cache
+from eggs.db import async_session, engine, ItemTombstoneModel, ListModel, ItemModel
+from eggs.events import Event, broker
+from eggs.logs import AccessLogMiddleware, configure_logging
+from eggs.metrics import MetricsMiddleware, instrument_engine, render_metrics, shutdown
+from eggs.replicas import get_read_db, get_write_db, replicas
+from eggs.shards import shards
+from eggs.responses import FastJSONResponse, item_dict, list_dict
+from eggs.search import search_items, search_terms
+from eggs.suggest import (
+    SUGGEST_REBUILD_INTERVAL,
+    SUGGEST_TOP_K,
+    rebuild,
+    rebuild_periodically,
+    suggestions,
+)
+from eggs.tombstones import (
+    TOMBSTONE_COMPACT_INTERVAL,
+    TOMBSTONE_MAX_AGE,
+    compact_periodically,
+    utcnow,
 )
+
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# Keyset pagination of the collection endpoints. The cursor of the next page is
+# returned in a header so the response body stays a plain JSON array.
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Cursors hold ids, which the database stores as 64-bit integers
+MAX_CURSOR = 2**63
+# Search pages by offset, and every page reads and skips the matches before
+# it; the first few pages are all anyone looks at
+MAX_SEARCH_OFFSET = 10 * MAX_PAGE_SIZE
+
+# What create endpoints do when the name is taken: fail with 409 Conflict, or
+# answer with the existing resource (200, versus 201 when it was created)
+OnConflict = Literal["error", "ignore"]
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+CONFLICT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    databases = shards.sessions or [async_session]
+    try:
+        await rebuild(suggestions, databases)
+    except Exception:
+        logger.exception("Failed to load item name suggestions")
+
+    tasks = []
+    poll_interval = float(os.environ.get("EVENTS_POLL_INTERVAL", 0))
+    if poll_interval > 0:
+        # One poller per database; each finds the subscribed lists it holds
+        for session_factory in databases:
+            tasks.append(
+                asyncio.create_task(broker.watch(session_factory, poll_interval))
+            )
+    tasks.extend(asyncio.create_task(batcher.run()) for batcher in batchers)
+    if TOMBSTONE_COMPACT_INTERVAL > 0:
+        for session_factory in databases:
+            tasks.append(
+                asyncio.create_task(
+                    compact_periodically(
+                        session_factory, TOMBSTONE_COMPACT_INTERVAL, TOMBSTONE_MAX_AGE
+                    )
+                )
+            )
+    if SUGGEST_REBUILD_INTERVAL > 0:
+        tasks.append(
+            asyncio.create_task(
+                rebuild_periodically(suggestions, databases, SUGGEST_REBUILD_INTERVAL)
+            )
+        )
+    yield
+    for task in tasks:
+        task.cancel()
+    shutdown()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Eggs API",
     description="A simple API for managing lists",
     version="1.0.0",
@@ -36,7 +125,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
+app.add_middleware(AccessLogMiddleware)
+app.add_middleware(MetricsMiddleware)
+if shards and replicas:
+    raise RuntimeError("DATABASE_READ_URLS and DATABASE_SHARD_URLS are exclusive")
+instrument_engine(engine)
+for index, replica_engine in enumerate(replicas.engines):
+    instrument_engine(replica_engine, f"replica-{index}")
+for index, shard_engine in enumerate(shards.engines):
+    instrument_engine(shard_engine, f"shard-{index}")
 
 
 # Reusable validated name field using Pydantic's Field constraints
@@ -51,6 +150,17 @@ class ItemUpdate(BaseModel):
     is_in_cart: bool
 
 
+class BulkItemUpdate(BaseModel):
+    """Model for setting the cart flag of many items at once."""
+
+    is_in_cart: bool
+    names: Optional[list[ValidatedName]] = Field(
+        default=None,
+        max_length=MAX_PAGE_SIZE,
+        description="The items to update; all items in the list when omitted",
+    )
+
+
 class ItemCreate(BaseModel):
     """Model for creating a new item."""
 
@@ -77,8 +187,42 @@ class ItemResponse(BaseModel):
     is_in_cart: bool
 
 
-@app.get("/api/v1/lists/{list_name}")
-async def get_list_by_name(list_name: str, db: Session = Depends(get_db)) -> ListModel:
+class ListDetailResponse(ListResponse):
+    """Response model for a List together with its items."""
+
+    items: list[ItemResponse]
+
+
+class BulkItemResult(BaseModel):
+    """Outcome for one name in a bulk item creation."""
+
+    id: int
+    name: ValidatedName
+    status: Literal["created", "duplicate"]
+
+
+class SearchResult(ItemResponse):
+    """An item matching a search, with the name of its list."""
+
+    list_name: ValidatedName
+
+
+class ItemChange(ItemResponse):
+    """An item created or updated since the version a client synced."""
+
+    version: int
+
+
+class ListChanges(BaseModel):
+    """Response model for the changes to a list since a version."""
+
+    instance: int
+    version: int
+    items: list[ItemChange]
+    deleted: list[ValidatedName]
+
+
+async def get_list_by_name(list_name: str, db: AsyncSession) -> ListModel:
     """
     Get a list by name.
 
@@ -93,7 +237,7 @@ async def get_list_by_name(list_name: str, db: Session = Depends(get_db)) -> Lis
         HTTPException: If the list is not found
     """
     statement = select(ListModel).where(ListModel.name == list_name)
-    list_item = db.exec(statement).first()
+    list_item = (await db.exec(statement)).first()
 
     if not list_item:
         raise HTTPException(status_code=404, detail=f"List not found: {list_name}")
@@ -101,6 +245,367 @@ async def get_list_by_name(list_name: str, db: Session = Depends(get_db)) -> Lis
     return list_item
 
 
+async def get_list_id(list_name: str, db: AsyncSession) -> int:
+    """
+    Get the id of a list by name, from the list cache when possible.
+
+    Args:
+        list_name: The name of the list
+        db: Database session
+
+    Returns:
+        int: The id of the list
+
+    Raises:
+        HTTPException: If the list is not found
+    """
+    list_id = list_cache.get(list_name)
+    if list_id is None:
+        list_id = (await get_list_by_name(list_name, db)).id
+        list_cache.set(list_name, list_id)
+    return list_id
+
+
+async def get_list_version(
+    list_name: str, db: AsyncSession
+) -> tuple[int, int, int]:
+    """
+    Get the id, instance and current version of a list by name.
+
+    Args:
+        list_name: The name of the list
+        db: Database session
+
+    Returns:
+        tuple: The id, instance and version of the list
+
+    Raises:
+        HTTPException: If the list is not found
+    """
+    statement = select(ListModel.id, ListModel.instance, ListModel.version).where(
+        ListModel.name == list_name
+    )
+    row = (await db.exec(statement)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail=f"List not found: {list_name}")
+    return row.id, row.instance, row.version
+
+
+async def bump_list_version(
+    db: AsyncSession, list_name: str, list_id: Optional[int] = None
+) -> tuple[int, int]:
+    """
+    Increment the version of a list as part of the current transaction.
+
+    Every handler that changes a list's items calls this before making the
+    change, so the version (and with it the ETag of the list's read endpoints)
+    changes exactly when the items do, and the changed items can be stamped
+    with it. Bumping first also locks the list's row, so concurrent writers
+    stamp their items with distinct versions.
+
+    Args:
+        db: Database session
+        list_name: The name of the list
+        list_id: The id of the list, possibly from the list cache. It is only
+            trusted if it still belongs to a list of that name: SQLite gives a
+            new list the id of the last deleted one. Without it, or when it is
+            stale, the list is found by name.
+
+    Returns:
+        tuple: The id of the list, to write its items with, and the new version
+
+    Raises:
+        HTTPException: If the list no longer exists (deleted by another worker,
+            while its id was still cached here)
+    """
+    where = [ListModel.name == list_name]
+    if list_id is not None:
+        where.append(ListModel.id == list_id)
+    statement = (
+        update(ListModel)
+        .where(*where)
+        .values(version=ListModel.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        row = (
+            await db.exec(statement.returning(ListModel.id, ListModel.version))
+        ).one_or_none()
+    else:
+        await db.exec(statement)
+        row = (
+            await db.exec(select(ListModel.id, ListModel.version).where(*where))
+        ).one_or_none()
+
+    if row is None:
+        list_cache.invalidate(list_name)
+        if list_id is not None:
+            # The cached id was stale; the list may exist under a new one
+            return await bump_list_version(db, list_name)
+        raise HTTPException(status_code=404, detail=f"List not found: {list_name}")
+    if row.id != list_id:
+        list_cache.set(list_name, row.id)
+    return row.id, row.version
+
+
+async def insert_ignore_returning(
+    db: AsyncSession, model, rows: list[dict[str, Any]], conflict: list, *returning
+) -> list:
+    """
+    Insert rows, skipping those that violate the unique constraint on `conflict`.
+
+    On SQLite and PostgreSQL this is one INSERT ... ON CONFLICT DO NOTHING
+    RETURNING statement, so a duplicate neither raises nor aborts the
+    transaction. Other dialects insert row by row, each in a savepoint.
+
+    Args:
+        db: Database session
+        model: The table to insert into
+        rows: Column values of the rows to insert
+        conflict: The columns of the unique constraint
+        *returning: Columns to return for every inserted row
+
+    Returns:
+        list: The requested columns of the rows that were inserted
+    """
+    if not rows:
+        # Without parameters the INSERT would add a row of defaults
+        return []
+    dialect = db.get_bind().dialect
+    conflict_insert = CONFLICT_INSERTS.get(dialect.name)
+    if conflict_insert is not None and dialect.insert_returning:
+        statement = (
+            conflict_insert(model)
+            .on_conflict_do_nothing(index_elements=conflict)
+            .returning(*returning)
+        )
+        return (await db.exec(statement, params=rows)).all()
+
+    ids = []
+    for row in rows:
+        try:
+            async with db.begin_nested():
+                result = await db.exec(insert(model).values(**row))
+        except IntegrityError:
+            continue
+        ids.append(result.inserted_primary_key[0])
+    if not ids:
+        return []
+    return (
+        await db.exec(select(*returning).where(model.id.in_(ids)).order_by(model.id))
+    ).all()
+
+
+async def insert_items(
+    db: AsyncSession, list_id: int, version: int, names: list[str], *returning
+) -> list:
+    """
+    Insert items into a list, skipping names the list already has.
+
+    Args:
+        db: Database session
+        list_id: The id of the list, checked by `bump_list_version`
+        version: The list version the items are created at
+        names: The names of the items to insert
+        *returning: Columns to return for every inserted item
+
+    Returns:
+        list: The requested columns of the items that were inserted
+    """
+    return await insert_ignore_returning(
+        db,
+        ItemModel,
+        [
+            {"list_id": list_id, "name": name, "is_in_cart": False, "version": version}
+            for name in names
+        ],
+        [ItemModel.list_id, ItemModel.name],
+        *returning,
+    )
+
+
+def publish_items(
+    list_name: str, version: int, change: str, items: list[ItemResponse]
+) -> None:
+    """Publish a committed change to the list's event stream subscribers."""
+    broker.publish(
+        list_name,
+        Event(version, change, [item.model_dump() for item in items]),
+    )
+
+
+def list_etag(instance: int, version: int) -> str:
+    """
+    Strong ETag for the read endpoints of a list at the given version.
+
+    The list's instance rather than its id keeps a list that was deleted and
+    created again from matching the ETags of the old one.
+    """
+    return f'"{instance}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+async def check_not_modified(
+    list_name: str, if_none_match: Optional[str], db: AsyncSession
+) -> Optional[Response]:
+    """
+    Answer a conditional GET on a list's items from the lists table alone.
+
+    Args:
+        list_name: The name of the list
+        if_none_match: The request's If-None-Match header
+        db: Database session
+
+    Returns:
+        Response: A 304 response if the client's copy is current, otherwise None
+
+    Raises:
+        HTTPException: If the list is not found
+    """
+    if not if_none_match:
+        return None
+    _, instance, version = await get_list_version(list_name, db)
+    etag = list_etag(instance, version)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+@app.get("/api/v1/lists/{list_name}")
+async def get_list(
+    list_name: str,
+    include: Optional[Literal["items"]] = None,
+    limit: Annotated[int, Query(ge=1)] = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> ListDetailResponse | ListResponse:
+    """
+    Get a list by name, optionally together with a page of its items.
+
+    With `include=items` the list and a page of its items are read with a single
+    LEFT JOIN, so a client can render a list with one request. The items are
+    paginated like `GET .../items/`: when there are more, the cursor for the
+    next page is returned in the X-Next-Cursor header. That response carries an
+    ETag; a matching If-None-Match is answered with 304 Not Modified.
+
+    Args:
+        list_name: The name of the list to retrieve
+        include: "items" to embed the list's items
+        limit: Maximum number of items to embed, capped at MAX_PAGE_SIZE
+        cursor: The X-Next-Cursor value of the previous page
+        if_none_match: ETag of the client's cached copy
+
+    Returns:
+        ListResponse | ListDetailResponse: The list, with its items if requested
+
+    Raises:
+        HTTPException: If the list is not found or the cursor is invalid
+    """
+    if include != "items":
+        return FastJSONResponse(list_dict(await get_list_by_name(list_name, db)))
+
+    if not_modified := await check_not_modified(list_name, if_none_match, db):
+        return not_modified
+
+    # The cursor goes into the join condition rather than the WHERE clause, so a
+    # page past the last item still returns the list itself
+    limit = min(limit, MAX_PAGE_SIZE)
+    after = decode_cursor(cursor)
+    rows = (
+        await db.exec(
+            select(
+                ListModel.id,
+                ListModel.name,
+                ListModel.instance,
+                ListModel.version,
+                ItemModel.id.label("item_id"),
+                ItemModel.name.label("item_name"),
+                ItemModel.is_in_cart,
+            )
+            .outerjoin(
+                ItemModel,
+                and_(ItemModel.list_id == ListModel.id, ItemModel.id > after),
+            )
+            .where(ListModel.name == list_name)
+            .order_by(ItemModel.id)
+            .limit(limit + 1)
+        )
+    ).all()
+
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"List not found: {list_name}")
+
+    list_id = rows[0].id
+    headers = {"ETag": list_etag(rows[0].instance, rows[0].version)}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].item_id)
+    return FastJSONResponse(
+        {
+            "id": list_id,
+            "name": rows[0].name,
+            "items": [
+                {
+                    "id": row.item_id,
+                    "list_id": list_id,
+                    "name": row.item_name,
+                    "is_in_cart": row.is_in_cart,
+                }
+                for row in rows
+                if row.item_id is not None
+            ],
+        },
+        headers=headers,
+    )
+
+
+@app.get(
+    "/api/v1/lists/{list_name}/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def list_events(
+    list_name: str,
+    last_event_id: Annotated[Optional[int], Header()] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> StreamingResponse:
+    """
+    Stream changes to a list's items as Server-Sent Events.
+
+    Events are named "created", "updated" or "deleted" with the affected items
+    as data, "changed" when the list was modified through another worker, and
+    "list_deleted". Their ids are list versions, so a reconnecting client that
+    sends Last-Event-ID receives what it missed, or a "resync" event telling it
+    to reload the list when that is no longer available.
+
+    Args:
+        list_name: The name of the list
+        last_event_id: The id of the last event the client received
+
+    Returns:
+        StreamingResponse: The event stream
+
+    Raises:
+        HTTPException: If the list is not found
+    """
+    _, _, version = await get_list_version(list_name, db)
+    # Don't hold a pooled connection for the lifetime of the stream
+    await db.close()
+    return StreamingResponse(
+        broker.stream(list_name, version, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/v1/health")
 async def health():
     """
@@ -109,58 +614,341 @@ async def health():
     Returns:
         str: "OK" if the API is healthy
     """
-    logger.info("Health check requested")
     return "OK"
 
 
+def encode_cursor(last_id: int) -> str:
+    """Encode the id of the last row on a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor: The cursor from a previous page, or None for the first page
+
+    Returns:
+        int: The id to continue after (0 for the first page)
+
+    Raises:
+        HTTPException: If the cursor is malformed, or its value does not fit a
+            64-bit integer column
+    """
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not 0 <= value < MAX_CURSOR:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value
+
+
+def encode_shard_cursor(last_ids: list[int]) -> str:
+    """Encode the last id returned from each shard as an opaque cursor."""
+    value = ",".join(map(str, last_ids))
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def decode_shard_cursor(cursor: Optional[str], shard_count: int) -> list[int]:
+    """
+    Decode a cursor produced by `encode_shard_cursor`.
+
+    Args:
+        cursor: The cursor from a previous page, or None for the first page
+        shard_count: The number of shards
+
+    Returns:
+        list[int]: The id to continue after on each shard
+
+    Raises:
+        HTTPException: If the cursor is malformed, holds ids out of range or
+            was made for other shards
+    """
+    if not cursor:
+        return [0] * shard_count
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_ids = [int(i) for i in base64.urlsafe_b64decode(padded).split(b",")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(last_ids) != shard_count or not all(
+        0 <= last_id < MAX_CURSOR for last_id in last_ids
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_ids
+
+
+async def fetch_page(
+    db: AsyncSession, statement, id_column, cursor: Optional[str], limit: int
+) -> tuple[list, Optional[str]]:
+    """
+    Run a keyset-paginated query: rows with an id after the cursor, in id order.
+
+    The limit is capped at MAX_PAGE_SIZE. One extra row is fetched to find out
+    whether there is a next page without a separate COUNT query.
+
+    Args:
+        db: Database session
+        statement: The select to paginate
+        id_column: The column to paginate on
+        cursor: The cursor from a previous page
+        limit: The requested page size
+
+    Returns:
+        tuple: The rows on this page and the cursor for the next one (None on the
+        last page)
+    """
+    limit = min(limit, MAX_PAGE_SIZE)
+    statement = (
+        statement.where(id_column > decode_cursor(cursor))
+        .order_by(id_column)
+        .limit(limit + 1)
+    )
+    rows = (await db.exec(statement)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].id)
+    return rows, None
+
+
+@app.get("/api/v1/search")
+async def search(
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1)] = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> list[SearchResult]:
+    """
+    Search item names across all lists, best match first.
+
+    Every word of the query must be the start of a word in the item's name, so
+    "choc br" finds "chocolate bread". Like the other collection endpoints, the
+    cursor of the next page is returned in the X-Next-Cursor header, for pages
+    that start within the first MAX_SEARCH_OFFSET matches.
+
+    Args:
+        q (str): The words to search for
+        limit (int): Maximum number of items to return, capped at MAX_PAGE_SIZE
+        cursor (str): The X-Next-Cursor value of the previous page
+
+    Returns:
+        list[SearchResult]: The matching items with the names of their lists
+
+    Raises:
+        HTTPException: If the cursor is invalid or past MAX_SEARCH_OFFSET
+    """
+    terms = search_terms(q)
+    if not terms:
+        return FastJSONResponse([])
+
+    # Ranked matches have no key to continue after, so the cursor is an offset
+    limit = min(limit, MAX_PAGE_SIZE)
+    offset = decode_cursor(cursor)
+    if offset > MAX_SEARCH_OFFSET:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if shards:
+        rows = await search_sharded(terms, offset, limit + 1)
+    else:
+        rows = await search_items(db, terms, offset, limit + 1)
+
+    headers = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if offset + limit <= MAX_SEARCH_OFFSET:
+            headers = {NEXT_CURSOR_HEADER: encode_cursor(offset + limit)}
+    return FastJSONResponse(
+        [{**item_dict(row), "list_name": row.list_name} for row in rows],
+        headers=headers,
+    )
+
+
+async def search_sharded(terms: list[str], offset: int, limit: int) -> list:
+    """
+    Search all shards in parallel and merge their matches by rank.
+
+    Args:
+        terms: Words from `search_terms`
+        offset: Number of matches to skip
+        limit: Maximum number of matches to return
+
+    Returns:
+        list: The matches, as returned by `search_items`
+    """
+
+    async def search_shard(shard: int) -> list:
+        async with shards.sessions[shard]() as db:
+            return await search_items(db, terms, 0, offset + limit)
+
+    pages = await asyncio.gather(*(search_shard(shard) for shard in range(len(shards))))
+    merged = heapq.merge(*pages, key=lambda row: row.rank)
+    return list(itertools.islice(merged, offset, offset + limit))
+
+
+@app.get("/api/v1/suggest")
+async def suggest(
+    prefix: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=SUGGEST_TOP_K)] = SUGGEST_TOP_K,
+) -> list[str]:
+    """
+    Suggest item names starting with a prefix, most used first.
+
+    Answered from memory, without querying the database.
+
+    Args:
+        prefix (str): What the user typed so far
+        limit (int): Maximum number of names to return
+
+    Returns:
+        list[str]: Item names in use in any list
+    """
+    return FastJSONResponse(suggestions.suggest(prefix, limit))
+
+
+@app.get("/api/v1/metrics")
+async def metrics() -> Response:
+    """
+    Get request, latency and database metrics in the Prometheus text format.
+
+    Returns:
+        Response: The metrics of all workers
+    """
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
+
+
+@app.get("/api/v1/cache")
+async def cache_stats() -> dict[str, int]:
+    """
+    Get the hit/miss counters of this worker's list name cache.
+
+    Returns:
+        dict: Hits, misses and the number of cached lists
+    """
+    return list_cache.stats()
+
+
 @app.get("/api/v1/lists/")
-async def read_lists(db: Session = Depends(get_db)) -> list[str]:
+async def read_lists(
+    limit: Annotated[int, Query(ge=1)] = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> list[str]:
     """
-    Get all lists.
+    Get a page of lists, in creation order.
+
+    When there are more lists, the cursor for the next page is returned in the
+    X-Next-Cursor response header.
+
+    Args:
+        limit: Maximum number of lists to return, capped at MAX_PAGE_SIZE
+        cursor: The X-Next-Cursor value of the previous page
 
     Returns:
         List[str]: A list of list names
     """
-    logger.info("Reading all lists")
-    statement = select(ListModel)
-    lists = db.exec(statement).all()
-    logger.debug(f"Found {len(lists)} lists")
-    return [list_item.name for list_item in lists]
+    if shards:
+        names, next_cursor = await read_lists_sharded(cursor, limit)
+        return FastJSONResponse(
+            names, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+        )
+
+    statement = select(ListModel.id, ListModel.name)
+    lists, next_cursor = await fetch_page(db, statement, ListModel.id, cursor, limit)
+    logger.debug("Found %d lists", len(lists))
+    return FastJSONResponse(
+        [list_item.name for list_item in lists],
+        headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None,
+    )
+
+
+async def read_lists_sharded(
+    cursor: Optional[str], limit: int
+) -> tuple[list[str], Optional[str]]:
+    """
+    Get a page of lists from all shards, merged in id order.
+
+    Every shard is asked for a page in parallel. The cursor holds the last id
+    returned from each shard, so ids may repeat across shards.
+
+    Args:
+        cursor: The cursor from a previous page
+        limit: The requested page size
+
+    Returns:
+        tuple: The list names on this page and the cursor for the next one
+        (None on the last page)
+
+    Raises:
+        HTTPException: If the cursor is malformed or was made for other shards
+    """
+    limit = min(limit, MAX_PAGE_SIZE)
+    after = decode_shard_cursor(cursor, len(shards))
+
+    async def fetch_shard(shard: int) -> list[tuple[int, int, str]]:
+        async with shards.sessions[shard]() as db:
+            rows = await db.exec(
+                select(ListModel.id, ListModel.name)
+                .where(ListModel.id > after[shard])
+                .order_by(ListModel.id)
+                .limit(limit + 1)
+            )
+            return [(row.id, shard, row.name) for row in rows]
+
+    pages = await asyncio.gather(*(fetch_shard(shard) for shard in range(len(shards))))
+    rows = list(itertools.islice(heapq.merge(*pages), limit + 1))
+    for list_id, shard, _ in rows[:limit]:
+        after[shard] = list_id
+    next_cursor = encode_shard_cursor(after) if len(rows) > limit else None
+    return [name for _, _, name in rows[:limit]], next_cursor
 
 
 @app.post("/api/v1/lists/{name}")
 async def create_list(
-    name: ValidatedName, db: Session = Depends(get_db)
+    name: ValidatedName,
+    response: Response,
+    on_conflict: OnConflict = "error",
+    db: AsyncSession = Depends(get_write_db),
 ) -> ListResponse:
     """
     Create a new list.
 
     Args:
         name (str): The name of the list to create
+        on_conflict (str): "error" to fail when the list exists, "ignore" to
+            return the existing list instead
 
     Returns:
-        ListResponse: The created list object
+        ListResponse: The created (or, with on_conflict=ignore, existing) list
 
     Raises:
-        HTTPException: If the list already exists
+        HTTPException: If the list already exists and on_conflict is "error"
     """
-
-    logger.info(f"Creating list: {name}")
-    try:
-        list_item = ListModel(name=name)
-        db.add(list_item)
-        db.commit()
-        db.refresh(list_item)
-        logger.info(f"Successfully created list: {name} with id: {list_item.id}")
-        return ListResponse.model_validate(list_item)
-    except IntegrityError:
-        db.rollback()
-        logger.warning(f"Failed to create list {name}: already exists")
+    rows = await insert_ignore_returning(
+        db, ListModel, [{"name": name}], [ListModel.name], ListModel.id, ListModel.name
+    )
+    if rows:
+        await db.commit()
+        list_cache.invalidate(name)
+        list_cache.set(name, rows[0].id)
+        if on_conflict == "ignore":
+            response.status_code = 201
+        return ListResponse.model_validate(rows[0])
+
+    logger.debug("List %r already exists", name)
+    if on_conflict == "error":
         raise HTTPException(status_code=409, detail="List already exists")
+    return ListResponse.model_validate(await get_list_by_name(name, db))
 
 
 @app.delete("/api/v1/lists/{name}")
-async def delete_list(name: str, db: Session = Depends(get_db)) -> dict[str, str]:
+async def delete_list(
+    name: str, db: AsyncSession = Depends(get_write_db)
+) -> dict[str, str]:
     """
     Delete a list.
 
@@ -173,23 +961,29 @@ async def delete_list(name: str, db: Session = Depends(get_db)) -> dict[str, str
     Raises:
         HTTPException: If the list is not found
     """
-    logger.info(f"Deleting list: {name}")
-    statement = select(ListModel).where(ListModel.name == name)
-    list_item = db.exec(statement).first()
-
-    if not list_item:
-        logger.warning(f"Attempted to delete non-existent list: {name}")
+    # One statement: the database deletes the items through ON DELETE CASCADE
+    result = await db.exec(
+        delete(ListModel)
+        .where(ListModel.name == name)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="List not found")
 
-    db.delete(list_item)
-    db.commit()
-    logger.info(f"Successfully deleted list: {name}")
+    await db.commit()
+    list_cache.invalidate(name)
+    broker.close_list(name)
     return {"message": f"List '{name}' deleted successfully"}
 
 
 @app.post("/api/v1/lists/{list_name}/items/{item_name}")
 async def create_item(
-    list_name: ValidatedName, item_name: ValidatedName, db: Session = Depends(get_db)
+    list_name: ValidatedName,
+    item_name: ValidatedName,
+    response: Response,
+    on_conflict: OnConflict = "error",
+    db: AsyncSession = Depends(get_write_db),
+    batcher: Optional[WriteBatcher] = Depends(get_batcher),
 ) -> ItemResponse:
     """
     Create a new item in a list.
@@ -197,67 +991,201 @@ async def create_item(
     Args:
         list_name (str): The name of the list
         item_name (str): The name of the item to create
+        on_conflict (str): "error" to fail when the item exists, "ignore" to
+            return the existing item instead
 
     Returns:
-        ItemResponse: The created item object
+        ItemResponse: The created (or, with on_conflict=ignore, existing) item
 
     Raises:
-        HTTPException: If the list is not found or item already exists
+        HTTPException: If the list is not found, or the item already exists and
+            on_conflict is "error"
     """
-
-    logger.info(f"Creating item '{item_name}' in list: {list_name}")
-    list_obj = await get_list_by_name(list_name, db)
+    cached_id = await get_list_id(list_name, db)
+
+    async def write(db: AsyncSession) -> tuple[Any, int]:
+        list_id, version = await bump_list_version(db, list_name, cached_id)
+        rows = await insert_items(
+            db,
+            list_id,
+            version,
+            [item_name],
+            ItemModel.id,
+            ItemModel.list_id,
+            ItemModel.name,
+            ItemModel.is_in_cart,
+        )
+        if not rows:
+            # Also takes back the version bump
+            raise HTTPException(
+                status_code=409, detail="Item already exists in this list"
+            )
+        return rows[0], version
 
     try:
-        new_item = ItemModel(name=item_name, list_id=list_obj.id)
-        db.add(new_item)
-        db.commit()
-        db.refresh(new_item)
-        logger.info(
-            f"Successfully created item '{item_name}' in list '{list_name}' with id: {new_item.id}"
+        row, version = await run_write(write, db, batcher)
+    except HTTPException as error:
+        if error.status_code != 409 or on_conflict == "error":
+            raise
+        logger.debug("Item %r already exists in list %r", item_name, list_name)
+    else:
+        item = ItemResponse.model_validate(row)
+        publish_items(list_name, version, "created", [item])
+        suggestions.add(item_name)
+        if on_conflict == "ignore":
+            response.status_code = 201
+        return item
+
+    existing = (
+        await db.exec(
+            select(ItemModel)
+            .join(ListModel)
+            .where(ListModel.name == list_name, ItemModel.name == item_name)
         )
-        return ItemResponse.model_validate(new_item)
-    except IntegrityError:
-        db.rollback()
-        logger.warning(
-            f"Failed to create item '{item_name}' in list '{list_name}': already exists"
+    ).first()
+    if not existing:
+        # Deleted again since our insert was skipped
+        raise HTTPException(status_code=404, detail="Item not found")
+    return ItemResponse.model_validate(existing)
+
+
+@app.post("/api/v1/lists/{list_name}/items")
+async def create_items(
+    list_name: ValidatedName,
+    item_names: Annotated[list[ValidatedName], Body(max_length=MAX_PAGE_SIZE)],
+    db: AsyncSession = Depends(get_write_db),
+) -> list[BulkItemResult]:
+    """
+    Create many items in a list in a single transaction.
+
+    Names that already exist in the list, or that occur more than once in the
+    request, are reported as duplicates instead of failing the request.
+
+    Args:
+        list_name (str): The name of the list
+        item_names (list[str]): The names of the items to create
+
+    Returns:
+        list[BulkItemResult]: The id and status of each name, in request order
+
+    Raises:
+        HTTPException: If the list is not found
+    """
+    list_id = await get_list_id(list_name, db)
+
+    unique_names = list(dict.fromkeys(item_names))
+    list_id, version = await bump_list_version(db, list_name, list_id)
+    created = dict(
+        await insert_items(
+            db, list_id, version, unique_names, ItemModel.name, ItemModel.id
+        )
+    )
+    if not created:
+        # Nothing changed; take back the version bump
+        await db.rollback()
+    else:
+        await db.commit()
+        for name in created:
+            suggestions.add(name)
+        publish_items(
+            list_name,
+            version,
+            "created",
+            [
+                ItemResponse(id=item_id, list_id=list_id, name=name, is_in_cart=False)
+                for name, item_id in created.items()
+            ],
         )
-        raise HTTPException(status_code=409, detail="Item already exists in this list")
+
+    existing = {}
+    if len(created) < len(unique_names):
+        existing = dict(
+            (
+                await db.exec(
+                    select(ItemModel.name, ItemModel.id).where(
+                        ItemModel.list_id == list_id,
+                        ItemModel.name.in_(set(unique_names) - created.keys()),
+                    )
+                )
+            ).all()
+        )
+
+    ids = {**existing, **created}
+    results = []
+    for name in item_names:
+        status = "created" if created.pop(name, None) else "duplicate"
+        results.append(BulkItemResult(id=ids[name], name=name, status=status))
+
+    logger.debug(
+        "Created %d of %d items in list %r",
+        sum(r.status == "created" for r in results),
+        len(item_names),
+        list_name,
+    )
+    return results
 
 
 @app.get("/api/v1/lists/{list_name}/items/")
-async def get_items(list_name: str, db: Session = Depends(get_db)) -> list[str]:
+async def get_items(
+    list_name: str,
+    limit: Annotated[int, Query(ge=1)] = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> list[str]:
     """
-    Get all items from a list.
+    Get a page of items from a list, in creation order.
+
+    When there are more items, the cursor for the next page is returned in the
+    X-Next-Cursor response header. The response carries an ETag derived from
+    the list's version; a matching If-None-Match is answered with 304 Not
+    Modified without reading the items.
 
     Args:
         list_name (str): The name of the list
+        limit (int): Maximum number of items to return, capped at MAX_PAGE_SIZE
+        cursor (str): The X-Next-Cursor value of the previous page
+        if_none_match (str): ETag of the client's cached copy
 
     Returns:
         List[str]: A list of item names
 
     Raises:
-        HTTPException: If the list is not found
+        HTTPException: If the list is not found or the cursor is invalid
     """
-    logger.info(f"Reading items from list: {list_name}")
-    list_obj = await get_list_by_name(list_name, db)
+    list_id, instance, version = await get_list_version(list_name, db)
+    etag = list_etag(instance, version)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-    statement = select(ItemModel).where(ItemModel.list_id == list_obj.id)
-    items = db.exec(statement).all()
-    logger.debug(f"Found {len(items)} items in list '{list_name}'")
-    return [item.name for item in items]
+    statement = select(ItemModel.id, ItemModel.name).where(
+        ItemModel.list_id == list_id
+    )
+    items, next_cursor = await fetch_page(db, statement, ItemModel.id, cursor, limit)
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    logger.debug("Found %d items in list %r", len(items), list_name)
+    return FastJSONResponse([item.name for item in items], headers=headers)
 
 
 @app.get("/api/v1/lists/{list_name}/items/{item_name}")
 async def get_item(
-    list_name: ValidatedName, item_name: ValidatedName, db: Session = Depends(get_db)
+    list_name: ValidatedName,
+    item_name: ValidatedName,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+    db: AsyncSession = Depends(get_read_db),
 ) -> ItemResponse:
     """
     Get an item from a list.
 
+    The response carries the ETag of the list; a matching If-None-Match is
+    answered with 304 Not Modified without reading the item.
+
     Args:
         list_name (str): The name of the list
         item_name (str): The name of the item to retrieve
+        if_none_match (str): ETag of the client's cached copy
 
     Returns:
         ItemResponse: The item object
@@ -265,27 +1193,130 @@ async def get_item(
     Raises:
         HTTPException: If the list or item is not found
     """
-    logger.info(f"Getting item '{item_name}' from list: {list_name}")
-
-    item = db.exec(
-        select(ItemModel)
-        .join(ListModel)
-        .where((ListModel.name == list_name) & (ItemModel.name == item_name))
+    if not_modified := await check_not_modified(list_name, if_none_match, db):
+        return not_modified
+
+    item = (
+        await db.exec(
+            select(
+                ItemModel.id,
+                ItemModel.list_id,
+                ItemModel.name,
+                ItemModel.is_in_cart,
+                ListModel.instance,
+                ListModel.version,
+            )
+            .join(ListModel)
+            .where((ListModel.name == list_name) & (ItemModel.name == item_name))
+        )
     ).first()
 
     if not item:
-        logger.warning(
-            f"Attempted to get non-existent item '{item_name}' from list '{list_name}'"
-        )
         raise HTTPException(status_code=404, detail="Item not found")
 
-    logger.info(f"Successfully retrieved item '{item_name}' from list '{list_name}'")
-    return ItemResponse.model_validate(item)
+    return FastJSONResponse(
+        item_dict(item), headers={"ETag": list_etag(item.instance, item.version)}
+    )
+
+
+@app.get("/api/v1/lists/{list_name}/changes")
+async def get_changes(
+    list_name: ValidatedName,
+    since: Annotated[int, Query(ge=0)],
+    instance: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+) -> ListChanges:
+    """
+    Get the items of a list that changed since a version.
+
+    Clients keep the returned instance and version and pass them as `instance`
+    and `since` on their next sync; since=0 returns all items. Deletions should
+    be applied before the items, since an item that was deleted and created
+    again is in both.
+
+    Args:
+        list_name (str): The name of the list
+        since (int): The version of the client's last sync
+        instance (int): The instance of the list at the client's last sync,
+            required unless since is 0
+
+    Returns:
+        ListChanges: The current version, the created or updated items and the
+        names of the deleted ones
+
+    Raises:
+        HTTPException: With 400 if since is given without instance, 404 if
+            the list is not found, or 410 Gone if the changes since that
+            version are no longer known (its tombstones were compacted, or the
+            list was recreated or moved to another shard) and the client must
+            fetch the whole list again
+    """
+    if since > 0 and instance is None:
+        raise HTTPException(
+            status_code=400, detail="instance is required when since is given"
+        )
+    row = (
+        await db.exec(
+            select(
+                ListModel.id,
+                ListModel.instance,
+                ListModel.version,
+                ListModel.compacted_version,
+            ).where(ListModel.name == list_name)
+        )
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail=f"List not found: {list_name}")
+    if since > 0 and (
+        instance != row.instance
+        or since > row.version
+        or since < row.compacted_version
+    ):
+        raise HTTPException(
+            status_code=410, detail="Changes since this version are no longer known"
+        )
+    if since == row.version:
+        return FastJSONResponse(
+            {"instance": row.instance, "version": since, "items": [], "deleted": []}
+        )
+
+    items = await db.exec(
+        select(
+            ItemModel.id,
+            ItemModel.list_id,
+            ItemModel.name,
+            ItemModel.is_in_cart,
+            ItemModel.version,
+        )
+        .where(ItemModel.list_id == row.id, ItemModel.version > since)
+        .order_by(ItemModel.id)
+    )
+    deleted = []
+    if since > 0:
+        deleted = await db.exec(
+            select(ItemTombstoneModel.name)
+            .where(
+                ItemTombstoneModel.list_id == row.id,
+                ItemTombstoneModel.version > since,
+            )
+            .order_by(ItemTombstoneModel.version)
+        )
+    return FastJSONResponse(
+        {
+            "instance": row.instance,
+            "version": row.version,
+            "items": [{**item_dict(item), "version": item.version} for item in items],
+            "deleted": list(dict.fromkeys(deleted)),
+        }
+    )
 
 
 @app.delete("/api/v1/lists/{list_name}/items/{item_name}")
 async def delete_item(
-    list_name: ValidatedName, item_name: ValidatedName, db: Session = Depends(get_db)
+    list_name: ValidatedName,
+    item_name: ValidatedName,
+    db: AsyncSession = Depends(get_write_db),
+    batcher: Optional[WriteBatcher] = Depends(get_batcher),
 ) -> dict[str, str]:
     """
     Delete an item from a list.
@@ -300,34 +1331,123 @@ async def delete_item(
     Raises:
         HTTPException: If the list or item is not found
     """
-    logger.info(f"Deleting item '{item_name}' from list: {list_name}")
-    list_obj = await get_list_by_name(list_name, db)
-
-    statement = select(ItemModel).where(
-        ItemModel.list_id == list_obj.id, ItemModel.name == item_name
-    )
-    item = db.exec(statement).first()
-
-    if not item:
-        logger.warning(
-            f"Attempted to delete non-existent item '{item_name}' from list '{list_name}'"
+    cached_id = await get_list_id(list_name, db)
+
+    async def write(db: AsyncSession) -> tuple[Any, int]:
+        list_id, version = await bump_list_version(db, list_name, cached_id)
+        where = (ItemModel.list_id == list_id, ItemModel.name == item_name)
+        columns = (
+            ItemModel.id,
+            ItemModel.list_id,
+            ItemModel.name,
+            ItemModel.is_in_cart,
         )
-        raise HTTPException(status_code=404, detail="Item not found")
+        statement = (
+            delete(ItemModel)
+            .where(*where)
+            .execution_options(synchronize_session=False)
+        )
+        if db.get_bind().dialect.delete_returning:
+            item = (await db.exec(statement.returning(*columns))).first()
+        else:
+            item = (await db.exec(select(*columns).where(*where))).first()
+            await db.exec(statement)
+        if item is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+
+        await db.exec(
+            insert(ItemTombstoneModel).values(
+                list_id=list_id, name=item_name, version=version, deleted_at=utcnow()
+            )
+        )
+        return item, version
 
-    db.delete(item)
-    db.commit()
-    logger.info(f"Successfully deleted item '{item_name}' from list '{list_name}'")
+    item, version = await run_write(write, db, batcher)
+    publish_items(list_name, version, "deleted", [ItemResponse.model_validate(item)])
+    suggestions.remove(item_name)
     return {
         "message": f"Item '{item_name}' deleted successfully from list '{list_name}'"
     }
 
 
+async def update_items_returning(db: AsyncSession, *where, **values) -> list:
+    """
+    Update the items matching `where` and return the updated rows.
+
+    Uses a single UPDATE ... RETURNING where the dialect supports it, and an
+    UPDATE followed by a SELECT otherwise.
+
+    Args:
+        db: Database session
+        where: Criteria selecting the items to update
+        values: Column values to set
+
+    Returns:
+        list: The updated rows, ordered by id
+    """
+    columns = (ItemModel.id, ItemModel.list_id, ItemModel.name, ItemModel.is_in_cart)
+    statement = (
+        update(ItemModel)
+        .where(*where)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        rows = (await db.exec(statement.returning(*columns))).all()
+        return sorted(rows, key=lambda row: row.id)
+
+    await db.exec(statement)
+    return (await db.exec(select(*columns).where(*where).order_by(ItemModel.id))).all()
+
+
+@app.put("/api/v1/lists/{list_name}/items")
+async def update_items(
+    list_name: ValidatedName,
+    bulk_update: BulkItemUpdate,
+    db: AsyncSession = Depends(get_write_db),
+) -> list[ItemResponse]:
+    """
+    Set the cart flag of many items in a list with one UPDATE.
+
+    Args:
+        list_name (str): The name of the list
+        bulk_update (BulkItemUpdate): The flag to set and the names of the items
+            to set it on (all items when omitted)
+
+    Returns:
+        list[ItemResponse]: The updated items; names not in the list are skipped
+
+    Raises:
+        HTTPException: If the list is not found
+    """
+    list_id = await get_list_id(list_name, db)
+    list_id, version = await bump_list_version(db, list_name, list_id)
+
+    where = [ItemModel.list_id == list_id]
+    if bulk_update.names is not None:
+        where.append(ItemModel.name.in_(bulk_update.names))
+
+    rows = await update_items_returning(
+        db, *where, is_in_cart=bulk_update.is_in_cart, version=version
+    )
+    items = [ItemResponse.model_validate(row) for row in rows]
+    if not items:
+        # Nothing changed; take back the version bump
+        await db.rollback()
+    else:
+        await db.commit()
+        publish_items(list_name, version, "updated", items)
+    logger.debug("Updated %d items in list %r", len(rows), list_name)
+    return items
+
+
 @app.put("/api/v1/lists/{list_name}/items/{item_name}")
 async def update_item(
     list_name: ValidatedName,
     item_name: ValidatedName,
     item_update: ItemUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_write_db),
+    batcher: Optional[WriteBatcher] = Depends(get_batcher),
 ) -> ItemResponse:
     """
     Update an item in a list.
@@ -343,39 +1463,151 @@ async def update_item(
     Raises:
         HTTPException: If the list or item is not found
     """
-    logger.info(f"Updating item '{item_name}' in list: {list_name}")
+    # Both statements find the list by name, so no lookup of its id is needed
+    list_id = (
+        select(ListModel.id).where(ListModel.name == list_name).scalar_subquery()
+    )
+    values = item_update.model_dump(exclude_unset=True)
+
+    async def write(db: AsyncSession) -> tuple[Any, int]:
+        _, version = await bump_list_version(db, list_name)
+        rows = await update_items_returning(
+            db,
+            ItemModel.list_id == list_id,
+            ItemModel.name == item_name,
+            **values,
+            version=version,
+        )
+        if not rows:
+            raise HTTPException(status_code=404, detail="Item not found")
+        return rows[0], version
+
+    item, version = await run_write(write, db, batcher)
+    updated = ItemResponse.model_validate(item)
+    publish_items(list_name, version, "updated", [updated])
+    return updated
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """
+    Parse the command line of the `eggs` entry point.
 
-    # Get the list
-    list_obj = await get_list_by_name(list_name, db)
+    Every flag falls back to an environment variable so the same image can be
+    configured from a process manager or container runtime.
 
-    # Get the item
-    statement = select(ItemModel).where(
-        ItemModel.list_id == list_obj.id, ItemModel.name == item_name
+    Args:
+        argv: Arguments to parse, defaults to sys.argv
+
+    Returns:
+        argparse.Namespace: The parsed server settings
+    """
+    parser = argparse.ArgumentParser(prog="eggs", description=app.description)
+    parser.add_argument(
+        "--prod",
+        action="store_true",
+        default=os.environ.get("EGGS_ENV") == "production",
+        help="run in production mode: multiple workers, no reloader "
+        "(env: EGGS_ENV=production)",
+    )
+    parser.add_argument(
+        "--host", default=os.environ.get("HOST", "0.0.0.0"), help="(env: HOST)"
+    )
+    parser.add_argument(
+        "--port", type=int, default=_env_int("PORT", 8000), help="(env: PORT)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=_env_int("WEB_CONCURRENCY", None),
+        help="worker processes in production mode, defaults to the number of "
+        "CPU cores (env: WEB_CONCURRENCY)",
     )
-    item = db.exec(statement).first()
+    parser.add_argument(
+        "--keep-alive",
+        type=int,
+        default=_env_int("EGGS_KEEP_ALIVE", 5),
+        help="seconds to keep idle connections open (env: EGGS_KEEP_ALIVE)",
+    )
+    parser.add_argument(
+        "--backlog",
+        type=int,
+        default=_env_int("EGGS_BACKLOG", 2048),
+        help="maximum number of pending connections (env: EGGS_BACKLOG)",
+    )
+    parser.add_argument(
+        "--limit-concurrency",
+        type=int,
+        default=_env_int("EGGS_LIMIT_CONCURRENCY", None),
+        help="maximum concurrent connections per worker before answering 503 "
+        "(env: EGGS_LIMIT_CONCURRENCY)",
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=_env_int("EGGS_GRACEFUL_TIMEOUT", 30),
+        help="seconds to drain in-flight requests on shutdown "
+        "(env: EGGS_GRACEFUL_TIMEOUT)",
+    )
+    return parser.parse_args(argv)
 
-    if not item:
-        logger.warning(
-            f"Attempted to update non-existent item '{item_name}' in list '{list_name}'"
-        )
-        raise HTTPException(status_code=404, detail="Item not found")
 
-    # Update the item
-    for key, value in item_update.model_dump(exclude_unset=True).items():
-        setattr(item, key, value)
+def server_options(args: argparse.Namespace) -> dict[str, Any]:
+    """
+    Translate parsed settings into keyword arguments for `uvicorn.run`.
 
-    db.commit()
-    db.refresh(item)
-    logger.info(f"Successfully updated item '{item_name}' in list '{list_name}'")
-    return ItemResponse.model_validate(item)
+    Development mode keeps the single auto-reloading process. Production mode
+    forks one worker per core and picks uvloop/httptools when they are installed
+    (`pip install eggs[prod]`), falling back to asyncio/h11 otherwise.
 
+    Args:
+        args: Settings returned by `parse_args`
 
-async def main() -> None:
-    port = int(os.environ.get("PORT", 8000))
-    uvicorn.run("eggs.api:app", host="0.0.0.0", port=port, reload=True)
+    Returns:
+        dict: Keyword arguments for `uvicorn.run`
+    """
+    options: dict[str, Any] = {
+        "host": args.host,
+        "port": args.port,
+        "timeout_keep_alive": args.keep_alive,
+        "backlog": args.backlog,
+        "limit_concurrency": args.limit_concurrency,
+        "timeout_graceful_shutdown": args.graceful_timeout,
+        # AccessLogMiddleware writes the access log
+        "access_log": False,
+    }
+    if not args.prod:
+        options["reload"] = True
+        return options
+
+    options.update(
+        workers=args.workers or os.cpu_count() or 1,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        proxy_headers=True,
+    )
+    return options
 
 
-if __name__ == "__main__":
-    import asyncio
+def main(argv: Optional[list[str]] = None) -> None:
+    options = server_options(parse_args(argv))
+    if options.get("workers", 1) > 1:
+        # Lets the workers' list caches invalidate each other
+        os.environ.setdefault(
+            "LIST_CACHE_EPOCH_FILE",
+            os.path.join(tempfile.gettempdir(), f"eggs-list-cache-{os.getpid()}"),
+        )
+        # Relays changes made by other workers to this worker's event streams
+        os.environ.setdefault("EVENTS_POLL_INTERVAL", "1")
+        # Lets any worker report the metrics of all of them
+        os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp())
+    logger.info("Starting server with %s", options)
+    uvicorn.run("eggs.api:app", **options)
 
-    asyncio.run(main())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Optional group commit of item writes.
+
+With WRITE_BATCH_MAX_DELAY_MS set, creating, updating and deleting single
+items no longer commits a transaction per request. The writes of concurrent
+requests are queued and committed together once WRITE_BATCH_MAX_SIZE (default
+64) of them have run or the delay has passed, so the database syncs to disk once
+per batch. Every request still only gets its response after its batch was
+committed.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from fastapi import Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from eggs.db import async_session
+from eggs.metrics import WRITE_BATCH_LATENCY, WRITE_BATCH_SIZE
+from eggs.shards import shards
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+Operation = Callable[[AsyncSession], Awaitable[T]]
+
+
+class WriteBatcher:
+    """
+    Runs write operations from concurrent requests in shared transactions.
+
+    A single task executes the queued operations one after another, each in its
+    own savepoint, so an operation that fails only undoes its own changes and
+    only its caller gets the error. The transaction is committed after
+    `max_size` operations or `max_delay` seconds after the first one started,
+    whichever comes first.
+    """
+
+    def __init__(
+        self, session_factory: Callable, max_delay: float = 0.005, max_size: int = 64
+    ):
+        self.session_factory = session_factory
+        self.max_delay = max_delay
+        self.max_size = max_size
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def submit(self, operation: Operation[T]) -> T:
+        """
+        Run an operation in the next batch and wait until it was committed.
+
+        Args:
+            operation: Coroutine function that does the writes on the session it
+                is given, without committing
+
+        Returns:
+            The result of the operation
+
+        Raises:
+            Exception: Whatever the operation raised, or the error that failed
+                the commit of its batch
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, future, time.perf_counter()))
+        return await future
+
+    async def run(self) -> None:
+        """Execute and commit queued operations until cancelled."""
+        while True:
+            # Every operation taken off the queue, so that any failure of the
+            # batch, including opening it, reaches all of their callers
+            batch = [await self._queue.get()]
+            try:
+                await self._run_batch(batch)
+            except Exception as error:
+                logger.exception("Write batch of %d operations failed", len(batch))
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+
+    async def _run_batch(self, batch: list) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+        pending: list[tuple[asyncio.Future, Any, float]] = []
+        async with self.session_factory() as db:
+            conn = await db.connection()
+            if conn.dialect.name == "sqlite":
+                # pysqlite only opens a transaction before DML, which would make
+                # the first savepoint the outermost transaction and commit on
+                # release. Open it here, and take the write lock up front.
+                await conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+            entry = batch[0]
+            while True:
+                operation, future, queued = entry
+                try:
+                    async with db.begin_nested():
+                        result = await operation(db)
+                except Exception as error:
+                    if not future.done():
+                        future.set_exception(error)
+                else:
+                    pending.append((future, result, queued))
+
+                remaining = deadline - loop.time()
+                if len(batch) >= self.max_size or remaining <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(entry)
+
+            await db.commit()
+
+        committed = time.perf_counter()
+        WRITE_BATCH_SIZE.observe(len(batch))
+        for future, result, queued in pending:
+            WRITE_BATCH_LATENCY.observe(committed - queued)
+            if not future.done():
+                future.set_result(result)
+
+
+async def run_write(
+    operation: Operation[T], db: AsyncSession, batcher: Optional[WriteBatcher]
+) -> T:
+    """
+    Run a write operation and commit it, or roll it back if it raises.
+
+    Args:
+        operation: Coroutine function that does the writes on the session it is
+            given, without committing
+        db: The request's session, used when batching is off
+        batcher: The write batcher of the request's database, if any
+
+    Returns:
+        The result of the operation
+    """
+    if batcher is not None:
+        return await batcher.submit(operation)
+    try:
+        result = await operation(db)
+    except Exception:
+        # Like the savepoint of a batched operation
+        await db.rollback()
+        raise
+    await db.commit()
+    return result
+
+
+WRITE_BATCH_MAX_DELAY = float(os.getenv("WRITE_BATCH_MAX_DELAY_MS", 0)) / 1000
+WRITE_BATCH_MAX_SIZE = int(os.getenv("WRITE_BATCH_MAX_SIZE", 64))
+
+# One batcher per database, started by the app's lifespan
+batchers = (
+    [
+        WriteBatcher(session_factory, WRITE_BATCH_MAX_DELAY, WRITE_BATCH_MAX_SIZE)
+        for session_factory in shards.sessions or [async_session]
+    ]
+    if WRITE_BATCH_MAX_DELAY > 0
+    else []
+)
+
+
+def get_batcher(request: Request) -> Optional[WriteBatcher]:
+    """The write batcher of the database holding the request's list, if any."""
+    if not batchers:
+        return None
+    if shards:
+        return batchers[shards.shard_for(request.path_params["list_name"])]
+    return batchers[0]
@@ -0,0 +1,88 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class ListCache:
+    """
+    Bounded LRU cache of list name -> list id with a per-entry TTL.
+
+    Item endpoints only need a list's id, and list names almost never change,
+    so resolving the name from memory saves a SELECT on every item operation.
+
+    Entries are dropped locally by `invalidate`. To keep several worker
+    processes coherent, `invalidate` also touches a shared epoch file: every
+    worker stats that file on lookup and clears its cache when the file's
+    mtime has moved. Without an epoch file, the TTL bounds how long another
+    process can serve a stale id. A stale id is never written to: writers
+    check it against the list's name when they bump its version.
+    """
+
+    def __init__(
+        self, maxsize: int = 10000, ttl: float = 60.0, epoch_file: Optional[str] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.epoch_file = epoch_file
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._epoch = self._read_epoch()
+
+    def _read_epoch(self) -> int:
+        if not self.epoch_file:
+            return 0
+        try:
+            return os.stat(self.epoch_file).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _check_epoch(self) -> None:
+        epoch = self._read_epoch()
+        if epoch != self._epoch:
+            self._epoch = epoch
+            self._entries.clear()
+
+    def get(self, name: str) -> Optional[int]:
+        """Return the cached id of the named list, or None on a miss."""
+        self._check_epoch()
+        entry = self._entries.get(name)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[name]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(name)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, name: str, list_id: int) -> None:
+        """Cache the id of the named list, evicting the least recently used entry."""
+        self._entries[name] = (list_id, time.monotonic() + self.ttl)
+        self._entries.move_to_end(name)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, name: str) -> None:
+        """Drop the named list here and, through the epoch file, in other workers."""
+        self._entries.pop(name, None)
+        if self.epoch_file:
+            now = time.time_ns()
+            with open(self.epoch_file, "a"):
+                os.utime(self.epoch_file, ns=(now, now))
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+list_cache = ListCache(
+    maxsize=int(os.getenv("LIST_CACHE_SIZE", 10000)),
+    ttl=float(os.getenv("LIST_CACHE_TTL", 60)),
+    epoch_file=os.getenv("LIST_CACHE_EPOCH_FILE") or None,
+)
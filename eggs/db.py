@@ -1,35 +1,212 @@
 import os
-from typing import Generator, Optional
+import secrets
+from datetime import datetime
+from typing import Any, AsyncGenerator, Optional
 
-from sqlalchemy import UniqueConstraint
-from sqlmodel import create_engine, Session, SQLModel, Field, Relationship
+from sqlalchemy import DDL, Index, UniqueConstraint, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///lists.db")
-engine = create_engine(DATABASE_URL, echo=False)
+# Async drivers for the synchronous URLs people put in DATABASE_URL (and that
+# alembic.ini keeps using for migrations). asyncpg comes with the "postgres"
+# extra.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Rewrite a database URL to use an asyncio driver, e.g. sqlite -> sqlite+aiosqlite.
+
+    URLs that already name a driver (``sqlite+aiosqlite://``) are left alone.
+    """
+    scheme, sep, rest = url.partition("://")
+    if not sep or "+" in scheme:
+        return url
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+# Connection pragmas applied to every new SQLite connection. "performance" trades
+# a little durability on power loss (synchronous=NORMAL in WAL mode never
+# corrupts the database, but may roll back the last commits) for much cheaper
+# commits and readers that no longer block writers. Each pragma can be
+# overridden with SQLITE_<PRAGMA>, e.g. SQLITE_BUSY_TIMEOUT=10000.
+SQLITE_PROFILES: dict[str, dict[str, Any]] = {
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "mmap_size": 268435456,
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+    },
+    "default": {},
+}
+
+
+def sqlite_pragmas(profile: Optional[str] = None) -> dict[str, Any]:
+    """Return the pragmas of the named profile (SQLITE_PROFILE) with env overrides.
+
+    Foreign keys are enforced in every profile: deleting a list relies on the
+    ON DELETE CASCADE of items.list_id, which SQLite ignores otherwise.
+    """
+    profile = profile or os.getenv("SQLITE_PROFILE", "performance")
+    pragmas = {"foreign_keys": "ON", **SQLITE_PROFILES[profile]}
+    for name in SQLITE_PROFILES["performance"]:
+        value = os.getenv(f"SQLITE_{name.upper()}")
+        if value:
+            pragmas[name] = value
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine: AsyncEngine, pragmas: dict[str, Any]) -> None:
+    """Run the given pragmas on every connection the engine opens."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def pool_options(url: str) -> dict[str, Any]:
+    """
+    Pool sizing for the engine, read from DB_POOL_SIZE, DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT and DB_POOL_RECYCLE.
+
+    In-memory SQLite databases use a single static connection and take no
+    pool settings.
+    """
+    if make_url(url).database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 3600)),
+    }
+
+
+def create_db_engine(
+    url: str, sqlite_profile: Optional[str] = None, **kwargs: Any
+) -> AsyncEngine:
+    """Create an async engine with pool settings and, for SQLite, connection pragmas."""
+    engine = create_async_engine(url, **{**pool_options(url), **kwargs})
+    if engine.dialect.name == "sqlite":
+        apply_sqlite_pragmas(engine, sqlite_pragmas(sqlite_profile))
+    return engine
+
+
+DATABASE_URL = to_async_url(os.getenv("DATABASE_URL", "sqlite:///lists.db"))
+engine: AsyncEngine = create_db_engine(DATABASE_URL, echo=False)
+async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def new_list_instance() -> int:
+    """A random, non-zero identifier for a newly created list."""
+    return secrets.randbits(31) or 1
 
 
 class ListModel(SQLModel, table=True):
     __tablename__ = "lists"
     id: int = Field(default=None, primary_key=True)
     name: str = Field(unique=True)
-    items: list["ItemModel"] = Relationship(back_populates="list", cascade_delete=True)
+    # Tells a list apart from an earlier one of the same name: SQLite reuses
+    # the id of a deleted list and versions start again at 0. Part of ETags
+    # and sync tokens.
+    instance: int = Field(
+        default_factory=new_list_instance,
+        sa_column_kwargs={"default": new_list_instance, "server_default": "0"},
+    )
+    # Bumped by every item mutation; used for ETags
+    version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # Deletions up to this version were compacted away; clients that last
+    # synced before it must fetch the whole list again
+    compacted_version: int = Field(
+        default=0, sa_column_kwargs={"server_default": "0"}
+    )
+    # Items are deleted by the database (ON DELETE CASCADE), not loaded and
+    # deleted one by one by the ORM
+    items: list["ItemModel"] = Relationship(
+        back_populates="list", cascade_delete=True, passive_deletes=True
+    )
 
 
 class ItemModel(SQLModel, table=True):
     __tablename__ = "items"
-    __table_args__ = (UniqueConstraint("list_id", "name", name="uq_item_list_name"),)
+    __table_args__ = (
+        UniqueConstraint("list_id", "name", name="uq_item_list_name"),
+        # Lookups by list and name use the unique constraint's index. This one
+        # serves pages of a list in id order (SQLite appends the rowid to every
+        # index, so no sort is needed), whole-list updates and ON DELETE CASCADE.
+        Index("ix_items_list_id", "list_id"),
+    )
 
     id: int = Field(default=None, primary_key=True)
     list_id: int = Field(foreign_key="lists.id", ondelete="CASCADE")
     name: str
     is_in_cart: bool = Field(default=False)
+    # The list version of the item's last change, for GET .../changes
+    version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
     list: Optional[ListModel] = Relationship(back_populates="items")
 
 
+class ItemTombstoneModel(SQLModel, table=True):
+    """A deleted item, kept so that GET .../changes can report the deletion."""
+
+    __tablename__ = "item_tombstones"
+    __table_args__ = (
+        Index("ix_item_tombstones_list_version", "list_id", "version"),
+    )
+
+    id: int = Field(default=None, primary_key=True)
+    list_id: int = Field(foreign_key="lists.id", ondelete="CASCADE")
+    name: str
+    # The list version of the deletion
+    version: int
+    deleted_at: datetime = Field(index=True)
+
+
+# Full-text index of item names on SQLite (see eggs.search). It stores no copy of
+# the names (content='items'); triggers keep it in sync with the items table.
+# Only renames touch it, not the cart toggles. prefix='2 3' adds indexes for
+# the short prefixes typed first. Migrations that rebuild the items table
+# (batch_alter_table on SQLite) drop the triggers and must create them again.
+ITEMS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE items_fts USING fts5("
+    "name, content='items', content_rowid='id', prefix='2 3')",
+    "CREATE TRIGGER items_fts_insert AFTER INSERT ON items BEGIN "
+    "INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER items_fts_delete AFTER DELETE ON items BEGIN "
+    "INSERT INTO items_fts(items_fts, rowid, name) "
+    "VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER items_fts_update AFTER UPDATE OF name ON items BEGIN "
+    "INSERT INTO items_fts(items_fts, rowid, name) "
+    "VALUES ('delete', old.id, old.name); "
+    "INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name); END",
+)
+for _statement in ITEMS_FTS_DDL:
+    event.listen(
+        ItemModel.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    ItemModel.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS items_fts").execute_if(dialect="sqlite"),
+)
+
+
 def init_db(engine):
     SQLModel.metadata.create_all(engine)
 
 
-def get_db() -> Generator[Session, None, None]:
-    with Session(engine) as session:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session() as session:
         yield session
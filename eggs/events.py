@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Callable, NamedTuple, Optional
+
+from sqlmodel import select
+
+from eggs.db import ListModel
+
+logger = logging.getLogger(__name__)
+
+# How long clients wait before reconnecting after a stream ends
+RECONNECT_DELAY_MS = 3000
+
+
+class Event(NamedTuple):
+    """A change to a list. The id is the list version the change produced."""
+
+    id: int
+    type: str
+    data: Any
+
+    def encode(self) -> str:
+        """Format the event as a Server-Sent Events message."""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class _History:
+    """Recent events of one list, contiguous in version after `floor`."""
+
+    def __init__(self, floor: int, size: int):
+        self.floor = floor
+        self.events: deque[Event] = deque()
+        self.size = size
+
+    def append(self, event: Event) -> None:
+        self.events.append(event)
+        if len(self.events) > self.size:
+            self.floor = self.events.popleft().id
+
+    @property
+    def version(self) -> int:
+        return self.events[-1].id if self.events else self.floor
+
+
+class _Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue[Optional[Event]] = asyncio.Queue(queue_size)
+        self.overflowed = False
+
+
+class ListEventBroker:
+    """
+    In-process fan-out of list change events to Server-Sent Events streams.
+
+    Handlers publish an event after committing a change; the broker appends it
+    to a short per-list history and puts it on the queue of every subscriber of
+    that list. Idle subscribers cost a queue and a sleeping task, and nothing
+    touches the database per subscriber.
+
+    The history lets a reconnecting client resume from its Last-Event-ID. If
+    the events it missed are no longer (or were never) in this process's
+    history, it gets a "resync" event and should reload the list.
+
+    Changes made by other worker processes are picked up by `watch`, a single
+    poller per process that reads the versions of all lists that have local
+    subscribers and publishes a "changed" event when one has moved.
+    """
+
+    def __init__(
+        self,
+        history_size: int = 256,
+        max_lists: int = 10000,
+        queue_size: int = 256,
+        heartbeat: float = 15.0,
+        max_stream_seconds: float = 3600.0,
+    ):
+        self.history_size = history_size
+        self.max_lists = max_lists
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.max_stream_seconds = max_stream_seconds
+        self._histories: OrderedDict[str, _History] = OrderedDict()
+        self._subscribers: dict[str, set[_Subscriber]] = {}
+
+    def _history(self, list_name: str, floor: int) -> _History:
+        history = self._histories.get(list_name)
+        if history is None:
+            history = self._histories[list_name] = _History(floor, self.history_size)
+            if len(self._histories) > self.max_lists:
+                self._histories.popitem(last=False)
+        self._histories.move_to_end(list_name)
+        return history
+
+    def clear(self) -> None:
+        """Forget all histories. Open streams are left alone."""
+        self._histories.clear()
+
+    def subscriber_count(self, list_name: Optional[str] = None) -> int:
+        if list_name is not None:
+            return len(self._subscribers.get(list_name, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, list_name: str, event: Event) -> None:
+        """Record an event and hand it to the list's subscribers."""
+        history = self._history(list_name, event.id - 1)
+        if event.id <= history.version:
+            return
+        if event.id > history.version + 1 and event.type != "changed":
+            # Another worker changed the list in between; cover that gap
+            self.publish(list_name, Event(event.id - 1, "changed", {}))
+        history.append(event)
+
+        for subscriber in self._subscribers.get(list_name, ()):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+
+    def close_list(self, list_name: str) -> None:
+        """Publish the deletion of a list, end its streams and forget its history."""
+        history = self._histories.get(list_name)
+        version = history.version if history else 0
+        self.publish(list_name, Event(version + 1, "list_deleted", {"name": list_name}))
+        for subscriber in self._subscribers.get(list_name, ()):
+            try:
+                subscriber.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+        self._histories.pop(list_name, None)
+
+    async def stream(
+        self, list_name: str, version: int, last_event_id: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield Server-Sent Events messages for a list.
+
+        Args:
+            list_name: The name of the list
+            version: The list's current version in the database
+            last_event_id: The id of the last event the client received
+
+        Yields:
+            str: Encoded events, and comment lines as heartbeats
+        """
+        subscriber = _Subscriber(self.queue_size)
+        self._subscribers.setdefault(list_name, set()).add(subscriber)
+        try:
+            history = self._history(list_name, version)
+            sent = version if last_event_id is None else last_event_id
+            yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+
+            if sent < history.floor:
+                yield Event(history.version, "resync", {}).encode()
+                sent = history.version
+            for event in list(history.events):
+                if event.id > sent:
+                    yield event.encode()
+                    sent = event.id
+
+            deadline = time.monotonic() + self.max_stream_seconds
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), min(self.heartbeat, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if subscriber.overflowed:
+                    # Too slow to keep up; make the client reconnect and resume
+                    yield Event(sent, "resync", {}).encode()
+                    return
+                if event is None:
+                    return
+                if event.id > sent:
+                    yield event.encode()
+                    sent = event.id
+        finally:
+            subscribers = self._subscribers[list_name]
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[list_name]
+
+    async def watch(self, session_factory: Callable, interval: float) -> None:
+        """
+        Publish "changed" events for lists that were modified by other processes.
+
+        Runs one query per interval for all lists with subscribers in this
+        process, no matter how many subscribers there are.
+
+        Args:
+            session_factory: Returns a new database session
+            interval: Seconds between polls
+        """
+        while True:
+            await asyncio.sleep(interval)
+            names = list(self._subscribers)
+            if not names:
+                continue
+            try:
+                async with session_factory() as db:
+                    rows = (
+                        await db.exec(
+                            select(ListModel.name, ListModel.version).where(
+                                ListModel.name.in_(names)
+                            )
+                        )
+                    ).all()
+            except Exception:
+                logger.exception("Failed to poll list versions")
+                continue
+            for name, version in rows:
+                history = self._histories.get(name)
+                if history is not None and version > history.version:
+                    self.publish(name, Event(version, "changed", {}))
+
+
+broker = ListEventBroker(
+    heartbeat=float(os.getenv("EVENTS_HEARTBEAT", 15)),
+    max_stream_seconds=float(os.getenv("EVENTS_MAX_STREAM_SECONDS", 3600)),
+)
@@ -0,0 +1,135 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from typing import Optional
+
+access_logger = logging.getLogger("eggs.access")
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    Route all logging through a queue to a background thread.
+
+    The event loop only puts records on an in-memory queue; formatting them as
+    JSON and writing them to stderr happens in the listener thread. Like
+    `logging.basicConfig`, handlers are only installed if the root logger has
+    none yet; otherwise only the level is set.
+
+    Args:
+        level: The root log level, by default from LOG_LEVEL (INFO)
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+    if _listener is not None or root.handlers:
+        return
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(JSONFormatter())
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(_QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock QueueHandler formats the message here, on the caller's
+        # thread; leave that to the listener. Only exceptions are rendered now,
+        # since traceback objects must not outlive the request.
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware that logs one structured record per HTTP request.
+
+    Requests that end with a status below 400 are logged with probability
+    `sample_rate` (LOG_SAMPLE_RATE, default 1.0); client and server errors are
+    always logged. Nothing is built when the eggs.access logger is disabled.
+    """
+
+    def __init__(self, app, sample_rate: Optional[float] = None):
+        self.app = app
+        self.sample_rate = (
+            float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+            if sample_rate is None
+            else sample_rate
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not access_logger.isEnabledFor(logging.INFO):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if status >= 400 or random.random() < self.sample_rate:
+                duration = time.perf_counter() - start
+                route = scope.get("route")
+                client = scope.get("client")
+                access_logger.info(
+                    "%s %s %d",
+                    scope["method"],
+                    scope["path"],
+                    status,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "route": getattr(route, "path", None),
+                        "status": status,
+                        "duration_ms": round(duration * 1000, 3),
+                        "client": client[0] if client else None,
+                    },
+                )
@@ -0,0 +1,194 @@
+import os
+import re
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Worker processes write their samples to files in PROMETHEUS_MULTIPROC_DIR so
+# that whichever worker serves /metrics can report the sum over all workers.
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUESTS = Counter(
+    "eggs_http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "eggs_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+IN_FLIGHT = Gauge(
+    "eggs_http_requests_in_flight",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum",
+)
+QUERY_DURATION = Histogram(
+    "eggs_db_query_duration_seconds",
+    "SQL statement execution time by statement",
+    ["statement"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 0.5),
+)
+POOL_CHECKED_OUT = Gauge(
+    "eggs_db_pool_checked_out",
+    "Database connections currently checked out of the pool by database",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "eggs_db_pool_overflow",
+    "Connections opened beyond the pool size by database",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+POOL_CHECKOUTS = Counter(
+    "eggs_db_pool_checkouts_total",
+    "Connections checked out of the pool by database",
+    ["database"],
+)
+WRITE_BATCH_SIZE = Histogram(
+    "eggs_write_batch_size",
+    "Write operations committed together by the write batcher",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+WRITE_BATCH_LATENCY = Histogram(
+    "eggs_write_batch_latency_seconds",
+    "Time from queuing a write operation until its batch was committed",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+# asyncpg numbers its placeholders ($1, $2, ...), and SQLAlchemy adds casts to
+# some of them ($1::VARCHAR)
+_NUMBERED_PLACEHOLDERS = re.compile(r"\$\d+(?:::\w+)?")
+_PLACEHOLDERS = re.compile(r"\(\?(?:, \?)*\)")
+_ROWS = re.compile(r"\(\?\)(?:, \(\?\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_label(statement: str) -> str:
+    """
+    Normalize a SQL statement into a label value.
+
+    Numbered placeholders become `?`, and expanded IN lists and multi-row
+    VALUES collapse to a single placeholder, so every statement the API issues
+    maps to one time series whatever the driver.
+    """
+    statement = _NUMBERED_PLACEHOLDERS.sub("?", statement)
+    statement = _PLACEHOLDERS.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+    return _ROWS.sub("(?)", statement)
+
+
+def instrument_engine(engine: AsyncEngine, database: str = "primary") -> None:
+    """
+    Time every statement the engine executes and track its pool usage.
+
+    Args:
+        engine: The engine to instrument
+        database: Label of the engine's pool metrics, e.g. "replica-0"; the
+            pools of the primary, the replicas and the shards are reported
+            separately
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        QUERY_DURATION.labels(statement_label(statement)).observe(elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _discard_timer(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    pool = sync_engine.pool
+    checked_out = POOL_CHECKED_OUT.labels(database)
+    overflow = POOL_OVERFLOW.labels(database)
+    checkouts = POOL_CHECKOUTS.labels(database)
+
+    def _update_overflow():
+        if hasattr(pool, "overflow"):
+            overflow.set(max(pool.overflow(), 0))
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(*args):
+        checkouts.inc()
+        checked_out.inc()
+        _update_overflow()
+
+    # Counted here rather than read from pool.checkedout(), which still
+    # includes the connection while its checkin event runs
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(*args):
+        checked_out.dec()
+        _update_overflow()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that counts and times every HTTP request.
+
+    Requests are labelled with the route template (e.g.
+    /api/v1/lists/{list_name}/items/) rather than the path, to keep the number
+    of time series bounded; requests that match no route share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUESTS.labels(scope["method"], path, status).inc()
+            REQUEST_DURATION.labels(scope["method"], path).observe(elapsed)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render all metrics in the Prometheus text format, summed over workers."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def shutdown() -> None:
+    """Drop this worker's live gauges from the multiprocess totals."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
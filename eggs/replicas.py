@@ -0,0 +1,119 @@
+import os
+import time
+from typing import AsyncGenerator, Optional
+from urllib.parse import quote
+
+from fastapi import Depends, Request, Response
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from eggs.db import create_db_engine, to_async_url
+from eggs.shards import get_list_db
+
+# Set on responses to writes; while a client has it, its reads of the lists it
+# changed go to the primary so they see their own writes despite replica lag
+STICKY_COOKIE = "eggs_primary"
+
+
+class ReplicaSet:
+    """
+    Read replicas, handed out round-robin.
+
+    A replica whose connection fails is ejected for `eject_seconds`, after which
+    it gets another chance. When every replica is ejected, reads go to the
+    primary.
+    """
+
+    def __init__(self, urls: list[str], eject_seconds: float = 30.0):
+        self.eject_seconds = eject_seconds
+        self.engines = [create_db_engine(to_async_url(url)) for url in urls]
+        self.sessions = [
+            async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self._ejected_until = [0.0] * len(urls)
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def pick(self) -> Optional[int]:
+        """Return the index of the next healthy replica, or None if there is none."""
+        now = time.monotonic()
+        for _ in range(len(self)):
+            index = self._next
+            self._next = (self._next + 1) % len(self)
+            if self._ejected_until[index] <= now:
+                return index
+        return None
+
+    def eject(self, index: int) -> None:
+        """Take a replica out of rotation for `eject_seconds`."""
+        self._ejected_until[index] = time.monotonic() + self.eject_seconds
+
+
+READ_URLS = [url.strip() for url in os.getenv("DATABASE_READ_URLS", "").split(",")]
+replicas = ReplicaSet(
+    [url for url in READ_URLS if url],
+    eject_seconds=float(os.getenv("REPLICA_EJECT_SECONDS", 30)),
+)
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+
+async def get_read_db(
+    request: Request, db: AsyncSession = Depends(get_list_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for handlers that only read: a replica when there is a healthy one.
+
+    Clients that recently changed the list they read (see `get_write_db`), and
+    deployments without DATABASE_READ_URLS, get `db`: the primary, or with
+    sharding the list's shard. The replica's connection is opened before the
+    handler runs, so a replica that cannot be reached is ejected and the read
+    goes to the next one (or the primary) instead of failing.
+    """
+    if STICKY_COOKIE not in request.cookies:
+        for _ in range(len(replicas)):
+            index = replicas.pick()
+            if index is None:
+                break
+            async with replicas.sessions[index]() as session:
+                try:
+                    await session.connection()
+                except DBAPIError:
+                    replicas.eject(index)
+                    continue
+                try:
+                    yield session
+                except DBAPIError as error:
+                    if error.connection_invalidated or isinstance(
+                        error, OperationalError
+                    ):
+                        replicas.eject(index)
+                    raise
+                return
+    yield db
+
+
+async def get_write_db(
+    request: Request, response: Response, db: AsyncSession = Depends(get_list_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for handlers that write: always the primary (or the list's shard).
+
+    With replicas configured, the response sets a short-lived cookie scoped to
+    the changed list's URLs (all of /api/v1/lists for creating or deleting a
+    list), which sends the client's next reads there to the primary.
+    """
+    if replicas:
+        list_name = request.path_params.get("list_name")
+        response.set_cookie(
+            STICKY_COOKIE,
+            "1",
+            max_age=READ_YOUR_WRITES_SECONDS,
+            path=f"/api/v1/lists/{quote(list_name)}" if list_name else "/api/v1/lists",
+            httponly=True,
+            samesite="lax",
+        )
+    yield db
@@ -0,0 +1,73 @@
+"""
+Search of item names across all lists.
+
+On SQLite, names are looked up in the FTS5 index items_fts (see eggs.db) and
+ranked with bm25. Other databases fall back to an unranked LIKE scan.
+"""
+
+import re
+
+from sqlalchemy import column, literal, table
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from eggs.db import ItemModel, ListModel
+
+# How FTS5's default tokenizer splits names into words
+_WORD = re.compile(r"[^\W_]+")
+MAX_TERMS = 8
+
+items_fts = table("items_fts", column("rowid"), column("name"), column("rank"))
+
+
+def search_terms(q: str) -> list[str]:
+    """Split a search into the words to look for, dropping any query syntax."""
+    return _WORD.findall(q.lower())[:MAX_TERMS]
+
+
+def fts_query(terms: list[str]) -> str:
+    """An FTS5 query matching names with a word starting with each of the terms."""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+async def search_items(
+    db: AsyncSession, terms: list[str], offset: int, limit: int
+) -> list:
+    """
+    Find the items with a word starting with each of the terms, best match first.
+
+    Args:
+        db: Database session
+        terms: Words from `search_terms`
+        offset: Number of matches to skip
+        limit: Maximum number of matches to return
+
+    Returns:
+        list: Rows with the item's columns, its list_name and its rank (lower
+        is better)
+    """
+    columns = (
+        ItemModel.id,
+        ItemModel.list_id,
+        ItemModel.name,
+        ItemModel.is_in_cart,
+        ListModel.name.label("list_name"),
+    )
+    if db.get_bind().dialect.name == "sqlite":
+        # FTS5 sorts by rank itself, without a temporary b-tree
+        statement = (
+            select(*columns, items_fts.c.rank)
+            .select_from(items_fts)
+            .join(ItemModel, ItemModel.id == items_fts.c.rowid)
+            .join(ListModel, ListModel.id == ItemModel.list_id)
+            .where(items_fts.c.name.match(fts_query(terms)))
+            .order_by(items_fts.c.rank)
+        )
+    else:
+        statement = (
+            select(*columns, literal(0.0).label("rank"))
+            .join(ListModel, ListModel.id == ItemModel.list_id)
+            .where(*(ItemModel.name.ilike(f"%{term}%") for term in terms))
+            .order_by(ItemModel.id)
+        )
+    return (await db.exec(statement.offset(offset).limit(limit))).all()
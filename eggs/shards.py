@@ -0,0 +1,211 @@
+"""
+Optional sharding of lists across several databases.
+
+With DATABASE_SHARD_URLS set to a comma-separated list of database URLs, every
+list (and with it all its items) lives in the database its name hashes to.
+Shards are identified by their position in that list, so new shards must be
+appended. After adding shards, deploy the new setting and then move the lists
+that now hash elsewhere:
+
+    uv run python -m eggs.shards --dry-run
+    uv run python -m eggs.shards
+
+Lists are unavailable from the moment the new setting is live until they have
+been moved.
+"""
+
+import argparse
+import asyncio
+import bisect
+import hashlib
+import logging
+import os
+from typing import AsyncGenerator, NamedTuple
+
+from fastapi import Depends, Request
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from eggs.db import ItemModel, ListModel, create_db_engine, get_db, to_async_url
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(key: str) -> int:
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class ShardRing:
+    """
+    Consistent hash ring over `shards` shards with `vnodes` points per shard.
+
+    Adding a shard only moves the names that now land on one of its points,
+    about 1/n of all names, and all of them move to the new shard.
+    """
+
+    def __init__(self, shards: int, vnodes: int = 64):
+        points = sorted(
+            (_hash(f"shard-{shard}-{vnode}"), shard)
+            for shard in range(shards)
+            for vnode in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, name: str) -> int:
+        """Return the index of the shard that holds the named list."""
+        index = bisect.bisect(self._hashes, _hash(name)) % len(self._hashes)
+        return self._shards[index]
+
+
+class ShardSet:
+    """The shard databases, and the ring that maps list names onto them."""
+
+    def __init__(self, urls: list[str], vnodes: int = 64):
+        self.engines = [create_db_engine(to_async_url(url)) for url in urls]
+        self.sessions = [
+            async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            for engine in self.engines
+        ]
+        self.ring = ShardRing(len(urls), vnodes) if urls else None
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def shard_for(self, name: str) -> int:
+        return self.ring.shard_for(name)
+
+
+SHARD_URLS = [url.strip() for url in os.getenv("DATABASE_SHARD_URLS", "").split(",")]
+shards = ShardSet([url for url in SHARD_URLS if url])
+
+
+async def get_list_db(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session on the database that holds the list named in the request path.
+
+    Without sharding, and for requests that name no list, this is `db`.
+    """
+    params = request.path_params
+    list_name = params.get("list_name") or params.get("name")
+    if not shards or list_name is None:
+        yield db
+        return
+
+    async with shards.sessions[shards.shard_for(list_name)]() as session:
+        yield session
+
+
+class Move(NamedTuple):
+    name: str
+    source: int
+    target: int
+
+
+async def move_list(shard_set: ShardSet, move: Move) -> None:
+    """
+    Copy a list and its items to the target shard, then delete it at the source.
+
+    The list and its items get new ids on the target shard, and the list a new
+    instance, so clients that synced it must fetch it again. The list's version
+    and the versions of its items are kept; its tombstones are not, so the list
+    is marked as compacted up to its version.
+
+    Raises:
+        IntegrityError: If the target shard already has a list with the name
+    """
+    source_session = shard_set.sessions[move.source]
+    target_session = shard_set.sessions[move.target]
+    async with source_session() as source, target_session() as target:
+        list_row = (
+            await source.exec(select(ListModel).where(ListModel.name == move.name))
+        ).one()
+        items = (
+            await source.exec(
+                select(ItemModel.name, ItemModel.is_in_cart, ItemModel.version)
+                .where(ItemModel.list_id == list_row.id)
+                .order_by(ItemModel.id)
+            )
+        ).all()
+
+        list_id = (
+            await target.exec(
+                insert(ListModel)
+                .values(
+                    name=list_row.name,
+                    version=list_row.version,
+                    compacted_version=list_row.version,
+                )
+                .returning(ListModel.id)
+            )
+        ).scalar_one()
+        if items:
+            await target.exec(
+                insert(ItemModel),
+                params=[
+                    {
+                        "list_id": list_id,
+                        "name": name,
+                        "is_in_cart": is_in_cart,
+                        "version": version,
+                    }
+                    for name, is_in_cart, version in items
+                ],
+            )
+        await target.commit()
+
+        await source.exec(delete(ListModel).where(ListModel.id == list_row.id))
+        await source.commit()
+
+
+async def rebalance(shard_set: ShardSet, dry_run: bool = False) -> list[Move]:
+    """
+    Move every list that is not on the shard its name hashes to.
+
+    Args:
+        shard_set: The shards, including any that were added
+        dry_run: Only report the moves
+
+    Returns:
+        list[Move]: The lists that were (or, on a dry run, would be) moved
+    """
+    moves = []
+    for source, session_factory in enumerate(shard_set.sessions):
+        async with session_factory() as db:
+            names = (await db.exec(select(ListModel.name))).all()
+        for name in names:
+            target = shard_set.shard_for(name)
+            if target == source:
+                continue
+            move = Move(name, source, target)
+            if not dry_run:
+                try:
+                    await move_list(shard_set, move)
+                except IntegrityError:
+                    logger.error("Cannot move list %r: shard %d has one", name, target)
+                    continue
+            moves.append(move)
+    return moves
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Move lists to the shard their name hashes to"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="only list the moves")
+    args = parser.parse_args()
+    if not shards:
+        parser.error("DATABASE_SHARD_URLS is not set")
+
+    for move in asyncio.run(rebalance(shards, args.dry_run)):
+        print(f"{move.name}: shard {move.source} -> {move.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Autocomplete of item names from memory.
+
+Every process keeps a trie of the item names in use, weighted by the number of
+items with the name. It is built from the database at startup and rebuilt every
+SUGGEST_REBUILD_INTERVAL seconds (default 3600, 0 turns it off); in between,
+the item handlers add and remove names as they create and delete items. The
+rebuild picks up what the handlers can't see: items of deleted lists and the
+writes of other workers.
+
+Memory is bounded by SUGGEST_MAX_NAMES (default 10000) distinct names; the
+rebuild keeps the most frequent ones, and new names are ignored while full.
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import func
+from sqlmodel import select
+
+from eggs.db import ItemModel
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_TOP_K = 10
+SUGGEST_MAX_NAMES = int(os.getenv("SUGGEST_MAX_NAMES", 10000))
+SUGGEST_REBUILD_INTERVAL = float(os.getenv("SUGGEST_REBUILD_INTERVAL", 3600))
+
+
+class _Node:
+    __slots__ = ("children", "top", "key")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        # The most frequent names below this node, most frequent first
+        self.top: list[str] = []
+        # The name that ends here, if any
+        self.key: Optional[str] = None
+
+
+class SuggestionTrie:
+    """
+    Item names by prefix, ranked by how many items have them.
+
+    Names are matched case-insensitively and suggested in the spelling they
+    were first seen in. Every node keeps its `top_k` most frequent names, so a
+    lookup only walks the prefix.
+    """
+
+    def __init__(self, top_k: int = SUGGEST_TOP_K, max_names: int = SUGGEST_MAX_NAMES):
+        self.top_k = top_k
+        self.max_names = max_names
+        self._root = _Node()
+        self._counts: dict[str, int] = {}
+        self._names: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def suggest(self, prefix: str, limit: int = SUGGEST_TOP_K) -> list[str]:
+        """Return up to `limit` names starting with `prefix`, most frequent first."""
+        node = self._root
+        for char in prefix.lower():
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [self._names[key] for key in node.top[:limit]]
+
+    def add(self, name: str) -> None:
+        """Count one more item with the name."""
+        key = name.lower()
+        count = self._counts.get(key)
+        if count is None:
+            if len(self._counts) >= self.max_names:
+                return
+            self._names[key] = name
+            count = 0
+        self._counts[key] = count + 1
+
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _Node())
+            self._promote(node, key)
+        node.key = key
+
+    def remove(self, name: str) -> None:
+        """Count one item fewer with the name."""
+        key = name.lower()
+        count = self._counts.get(key)
+        if count is None:
+            return
+        path = self._path(key)
+        if count > 1:
+            self._counts[key] = count - 1
+            for node in path:
+                top = node.top
+                if key not in top:
+                    continue
+                top.sort(key=self._counts.__getitem__, reverse=True)
+                # Names left out of a full list can now outrank it
+                if len(top) >= self.top_k and top[-1] == key:
+                    node.top = self._top_below(node)
+            return
+
+        del self._counts[key], self._names[key]
+        path[-1].key = None
+        # Only nodes that ranked the name need to look for a replacement
+        for node in path:
+            if key in node.top:
+                node.top = self._top_below(node)
+        parent = self._root
+        for char, node in zip(key, path):
+            if not node.top:
+                del parent.children[char]
+                break
+            parent = node
+
+    def replace(self, entries: Iterable[tuple[str, int]]) -> None:
+        """
+        Replace the contents with the given names and counts.
+
+        Args:
+            entries: Names with their item counts, most frequent first
+        """
+        root, counts, names = _Node(), {}, {}
+        for name, count in entries:
+            key = name.lower()
+            if key in counts or len(counts) >= self.max_names:
+                continue
+            counts[key], names[key] = count, name
+            node = root
+            for char in key:
+                node = node.children.setdefault(char, _Node())
+                # Entries come most frequent first, so the first top_k stay
+                if len(node.top) < self.top_k:
+                    node.top.append(key)
+            node.key = key
+        self._root, self._counts, self._names = root, counts, names
+
+    def _promote(self, node: _Node, key: str) -> None:
+        top = node.top
+        if key not in top:
+            if len(top) >= self.top_k and self._counts[top[-1]] >= self._counts[key]:
+                return
+            top.append(key)
+        top.sort(key=self._counts.__getitem__, reverse=True)
+        del top[self.top_k :]
+
+    def _path(self, key: str) -> list[_Node]:
+        path, node = [], self._root
+        for char in key:
+            node = node.children[char]
+            path.append(node)
+        return path
+
+    def _top_below(self, node: _Node) -> list[str]:
+        keys, stack = [], [node]
+        while stack:
+            current = stack.pop()
+            if current.key is not None:
+                keys.append(current.key)
+            stack.extend(current.children.values())
+        return heapq.nlargest(self.top_k, keys, key=self._counts.__getitem__)
+
+
+suggestions = SuggestionTrie()
+
+
+async def rebuild(trie: SuggestionTrie, session_factories: list[Callable]) -> None:
+    """
+    Load the most frequent item names of all databases into the trie.
+
+    Args:
+        trie: The trie to replace the contents of
+        session_factories: Return a new session on each database
+    """
+    counts: dict[str, int] = {}
+    spellings: dict[str, str] = {}
+    key = func.lower(ItemModel.name)
+    statement = (
+        select(key, func.min(ItemModel.name), func.count())
+        .group_by(key)
+        .order_by(func.count().desc())
+        .limit(trie.max_names)
+    )
+    for session_factory in session_factories:
+        async with session_factory() as db:
+            for lowered, name, count in await db.exec(statement):
+                counts[lowered] = counts.get(lowered, 0) + count
+                spellings.setdefault(lowered, name)
+    trie.replace(
+        (spellings[lowered], count)
+        for lowered, count in sorted(counts.items(), key=lambda kv: -kv[1])
+    )
+    logger.debug("Loaded %d item names for suggestions", len(trie))
+
+
+async def rebuild_periodically(
+    trie: SuggestionTrie, session_factories: list[Callable], interval: float
+) -> None:
+    """Run `rebuild` every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await rebuild(trie, session_factories)
+        except Exception:
+            logger.exception("Failed to rebuild item name suggestions")
@@ -0,0 +1,82 @@
+"""
+Compaction of the tombstones of deleted items.
+
+Deleting an item leaves a tombstone so that GET .../changes can tell clients
+about the deletion. Tombstones older than TOMBSTONE_MAX_AGE_DAYS (default 30)
+are removed every TOMBSTONE_COMPACT_INTERVAL seconds (default 3600, 0 turns it
+off). A list remembers the newest version it lost tombstones of, and clients
+that last synced before it are told to fetch the whole list again.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import delete, func, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from eggs.db import ItemTombstoneModel, ListModel
+
+logger = logging.getLogger(__name__)
+
+TOMBSTONE_MAX_AGE = timedelta(days=float(os.getenv("TOMBSTONE_MAX_AGE_DAYS", 30)))
+TOMBSTONE_COMPACT_INTERVAL = float(os.getenv("TOMBSTONE_COMPACT_INTERVAL", 3600))
+
+
+def utcnow() -> datetime:
+    """The current time, for deleted_at."""
+    return datetime.now(timezone.utc)
+
+
+async def compact_tombstones(db: AsyncSession, max_age: timedelta) -> int:
+    """
+    Remove tombstones older than `max_age` and record where each list lost them.
+
+    Args:
+        db: Database session
+        max_age: How long deletions stay available to GET .../changes
+
+    Returns:
+        int: The number of tombstones removed
+    """
+    expired = ItemTombstoneModel.deleted_at < utcnow() - max_age
+    newest_expired = (
+        select(func.max(ItemTombstoneModel.version))
+        .where(ItemTombstoneModel.list_id == ListModel.id, expired)
+        .scalar_subquery()
+    )
+    await db.exec(
+        update(ListModel)
+        .where(ListModel.id.in_(select(ItemTombstoneModel.list_id).where(expired)))
+        .values(compacted_version=newest_expired)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.exec(delete(ItemTombstoneModel).where(expired))
+    await db.commit()
+    return result.rowcount
+
+
+async def compact_periodically(
+    session_factory: Callable, interval: float, max_age: timedelta
+) -> None:
+    """
+    Run `compact_tombstones` every `interval` seconds until cancelled.
+
+    Args:
+        session_factory: Returns a new database session
+        interval: Seconds between compactions
+        max_age: How long deletions stay available to GET .../changes
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                removed = await compact_tombstones(db, max_age)
+        except Exception:
+            logger.exception("Failed to compact tombstones")
+            continue
+        if removed:
+            logger.info("Compacted %d tombstones", removed)
@@ -6,6 +6,12 @@ import ItemList from './ItemList';
 // Mock fetch globally for testing
 (global.fetch as jest.Mock) = jest.fn();
 
+const listWithItems = (names: string[]) => ({
+  id: 1,
+  name: 'Groceries',
+  items: names.map((name, index) => ({ id: index + 1, list_id: 1, name, is_in_cart: false }))
+});
+
 describe('ItemList', () => {
   beforeEach(() => {
     jest.resetAllMocks();
@@ -14,7 +20,8 @@ describe('ItemList', () => {
   it('should display loading state when fetching items', async () => {
     (global.fetch as jest.Mock).mockResolvedValueOnce({
       ok: true,
-      json: jest.fn().mockResolvedValue([])
+      headers: { get: () => null },
+      json: jest.fn().mockResolvedValue(listWithItems([]))
     });
 
     render(<ItemList listName="Groceries" />);
@@ -26,10 +33,12 @@ describe('ItemList', () => {
     const mockItems = ['zebra', 'apple', 'Banana'];
     (global.fetch as jest.Mock).mockResolvedValueOnce({
       ok: true,
-      json: jest.fn().mockResolvedValue(mockItems)
+      headers: { get: () => null },
+      json: jest.fn().mockResolvedValue(listWithItems(mockItems))
     });
 
     render(<ItemList listName="Groceries" />);
+    expect(global.fetch).toHaveBeenCalledWith('http://localhost:8000/api/v1/lists/Groceries?include=items');
     
     // Wait for items to load
     await waitFor(() => {
@@ -48,7 +57,8 @@ describe('ItemList', () => {
   it('should display empty state when no items', async () => {
     (global.fetch as jest.Mock).mockResolvedValueOnce({
       ok: true,
-      json: jest.fn().mockResolvedValue([])
+      headers: { get: () => null },
+      json: jest.fn().mockResolvedValue(listWithItems([]))
     });
 
     render(<ItemList listName="Groceries" />);
@@ -6,7 +6,7 @@ import {
   CircularProgress,
   Alert
 } from '@mui/material';
-import ShoppingListService from '../services/shoppingListService';
+import ShoppingListService, { ShoppingListItem } from '../services/shoppingListService';
 import AddItemForm from './AddItemForm';
 import Item from './Item';
 
@@ -15,7 +15,7 @@ interface ItemListProps {
 }
 
 const ItemList = ({ listName }: ItemListProps) => {
-  const [items, setItems] = useState<string[]>([]);
+  const [items, setItems] = useState<ShoppingListItem[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -29,11 +29,12 @@ const ItemList = ({ listName }: ItemListProps) => {
       setLoading(true);
       setError(null);
 
-      const itemsData = await ShoppingListService.getItems(listName);
+      // The list and all of its items in one request, instead of a page at a time
+      const { items: itemsData } = await ShoppingListService.getListWithItems(listName);
 
       // Sort items alphabetically (case insensitive)
       const sortedItems = itemsData.sort((a, b) =>
-        a.toLowerCase().localeCompare(b.toLowerCase())
+        a.name.toLowerCase().localeCompare(b.name.toLowerCase())
       );
 
       setItems(sortedItems);
@@ -80,11 +81,11 @@ const ItemList = ({ listName }: ItemListProps) => {
         </Box>
       ) : (
         <List>
-          {items.map((itemName) => (
+          {items.map((item) => (
             <Item
-              key={itemName}
+              key={item.id}
               listName={listName!}
-              itemName={itemName}
+              itemName={item.name}
               onItemDeleted={fetchItems}
             />
           ))}
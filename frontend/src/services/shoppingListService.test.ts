@@ -14,6 +14,7 @@ describe('ShoppingListService', () => {
       const mockLists = ['Groceries', 'To-Do', 'Shopping'];
       (global.fetch as jest.Mock).mockResolvedValueOnce({
         ok: true,
+        headers: { get: () => null },
         json: jest.fn().mockResolvedValue(mockLists)
       });
 
@@ -38,6 +39,7 @@ describe('ShoppingListService', () => {
       const mockItems = ['Milk', 'Bread', 'Eggs'];
       (global.fetch as jest.Mock).mockResolvedValueOnce({
         ok: true,
+        headers: { get: () => null },
         json: jest.fn().mockResolvedValue(mockItems)
       });
 
@@ -46,6 +48,25 @@ describe('ShoppingListService', () => {
       expect(global.fetch).toHaveBeenCalledWith('http://localhost:8000/api/v1/lists/Groceries/items/');
     });
 
+    it('should follow the next cursor across pages', async () => {
+      const listName = 'Groceries';
+      (global.fetch as jest.Mock)
+        .mockResolvedValueOnce({
+          ok: true,
+          headers: { get: () => 'Mg' },
+          json: jest.fn().mockResolvedValue(['Milk', 'Bread'])
+        })
+        .mockResolvedValueOnce({
+          ok: true,
+          headers: { get: () => null },
+          json: jest.fn().mockResolvedValue(['Eggs'])
+        });
+
+      const items = await ShoppingListService.getItems(listName);
+      expect(items).toEqual(['Milk', 'Bread', 'Eggs']);
+      expect(global.fetch).toHaveBeenLastCalledWith('http://localhost:8000/api/v1/lists/Groceries/items/?cursor=Mg');
+    });
+
     it('should throw an error when fetch items fails', async () => {
       const listName = 'Groceries';
       (global.fetch as jest.Mock).mockResolvedValueOnce({
@@ -57,6 +78,58 @@ describe('ShoppingListService', () => {
     });
   });
 
+  describe('getListWithItems', () => {
+    it('should fetch a list with its items in one request', async () => {
+      const mockList = {
+        id: 1,
+        name: 'Groceries',
+        items: [{ id: 1, list_id: 1, name: 'Milk', is_in_cart: false }]
+      };
+      (global.fetch as jest.Mock).mockResolvedValueOnce({
+        ok: true,
+        status: 200,
+        headers: { get: () => null },
+        json: jest.fn().mockResolvedValue(mockList)
+      });
+
+      const list = await ShoppingListService.getListWithItems('Groceries');
+      expect(list).toEqual(mockList);
+      expect(global.fetch).toHaveBeenCalledTimes(1);
+      expect(global.fetch).toHaveBeenCalledWith('http://localhost:8000/api/v1/lists/Groceries?include=items');
+    });
+
+    it('should follow the next cursor across pages of items', async () => {
+      const milk = { id: 1, list_id: 1, name: 'Milk', is_in_cart: false };
+      const eggs = { id: 2, list_id: 1, name: 'Eggs', is_in_cart: true };
+      (global.fetch as jest.Mock)
+        .mockResolvedValueOnce({
+          ok: true,
+          status: 200,
+          headers: { get: () => 'MQ' },
+          json: jest.fn().mockResolvedValue({ id: 1, name: 'Groceries', items: [milk] })
+        })
+        .mockResolvedValueOnce({
+          ok: true,
+          status: 200,
+          headers: { get: () => null },
+          json: jest.fn().mockResolvedValue({ id: 1, name: 'Groceries', items: [eggs] })
+        });
+
+      const list = await ShoppingListService.getListWithItems('Groceries');
+      expect(list).toEqual({ id: 1, name: 'Groceries', items: [milk, eggs] });
+      expect(global.fetch).toHaveBeenLastCalledWith('http://localhost:8000/api/v1/lists/Groceries?include=items&cursor=MQ');
+    });
+
+    it('should throw NotFoundError for a missing list', async () => {
+      (global.fetch as jest.Mock).mockResolvedValueOnce({
+        ok: false,
+        status: 404
+      });
+
+      await expect(ShoppingListService.getListWithItems('Missing')).rejects.toThrow(NotFoundError);
+    });
+  });
+
   describe('createItem', () => {
 it('should create an item successfully', async () => {
        const listName = 'Groceries';
@@ -3,20 +3,60 @@ import { APIError, ConflictError, NotFoundError } from '../exceptions';
 // Base URL for the API - using the environment variable or default to localhost
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL || 'http://localhost:8000/api/v1';
 
+/**
+ * An item as returned by the API
+ */
+export interface ShoppingListItem {
+  id: number;
+  list_id: number;
+  name: string;
+  is_in_cart: boolean;
+}
+
+/**
+ * A list with its items, as returned by GET /lists/{name}?include=items
+ */
+export interface ShoppingListWithItems {
+  id: number;
+  name: string;
+  items: ShoppingListItem[];
+}
+
 /**
  * API service for shopping list operations
  */
 class ShoppingListService {
+  /**
+   * Fetch every page of a paginated collection, following the X-Next-Cursor header
+   * @param {string} url - URL of the collection
+   * @returns {Promise<Response[]>} The response of each page
+   */
+  static async fetchAllPages(url: string): Promise<Response[]> {
+    const pages: Response[] = [];
+    let cursor: string | null = null;
+    do {
+      const separator: string = url.includes('?') ? '&' : '?';
+      const pageUrl: string = cursor ? `${url}${separator}cursor=${encodeURIComponent(cursor)}` : url;
+      const response: Response = await fetch(pageUrl);
+      pages.push(response);
+      cursor = response.ok ? response.headers.get('X-Next-Cursor') : null;
+    } while (cursor);
+    return pages;
+  }
+
   /**
    * Fetch all lists from the backend
    * @returns {Promise<string[]>} List of list names
    */
   static async getLists(): Promise<string[]> {
-    const response = await fetch(`${API_BASE_URL}/lists/`);
-    if (!response.ok) {
-      throw new APIError(`HTTP error! status: ${response.status}`);
+    const lists: string[] = [];
+    for (const response of await ShoppingListService.fetchAllPages(`${API_BASE_URL}/lists/`)) {
+      if (!response.ok) {
+        throw new APIError(`HTTP error! status: ${response.status}`);
+      }
+      lists.push(...await response.json());
     }
-    return await response.json();
+    return lists;
   }
 
   /**
@@ -33,6 +73,30 @@ class ShoppingListService {
     return await response.json();
   }
 
+  /**
+   * Fetch a list together with all of its items, in a single request unless the
+   * items span several pages
+   * @param {string} listName - Name of the list
+   * @returns {Promise<ShoppingListWithItems>} The list with its id, name and items
+   */
+  static async getListWithItems(listName: string): Promise<ShoppingListWithItems> {
+    let list: ShoppingListWithItems | null = null;
+    for (const response of await ShoppingListService.fetchAllPages(`${API_BASE_URL}/lists/${listName}?include=items`)) {
+      if (response.status === 404) {
+        throw new NotFoundError(listName);
+      } else if (!response.ok) {
+        throw new APIError(`HTTP error! status: ${response.status}`);
+      }
+      const page: ShoppingListWithItems = await response.json();
+      if (list) {
+        list.items.push(...page.items);
+      } else {
+        list = page;
+      }
+    }
+    return list as ShoppingListWithItems;
+  }
+
   /**
    * Create a new list
    * @param {string} listName - Name of the list to create
@@ -61,15 +125,18 @@ class ShoppingListService {
    * @returns {Promise<string[]>} List of item names
    */
   static async getItems(listName: string): Promise<string[]> {
-    const response = await fetch(`${API_BASE_URL}/lists/${listName}/items/`);
-    if (!response.ok) {
-      if (response.status === 404) {
-        throw new NotFoundError(`No such list: ${listName}`);
-      } else {
-        throw new APIError(`HTTP error! status: ${response.status}`);
+    const items: string[] = [];
+    for (const response of await ShoppingListService.fetchAllPages(`${API_BASE_URL}/lists/${listName}/items/`)) {
+      if (!response.ok) {
+        if (response.status === 404) {
+          throw new NotFoundError(`No such list: ${listName}`);
+        } else {
+          throw new APIError(`HTTP error! status: ${response.status}`);
+        }
       }
+      items.push(...await response.json());
     }
-    return await response.json();
+    return items;
   }
 
   /**
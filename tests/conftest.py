@@ -0,0 +1,15 @@
+from tests.db import QUERY_REPORT
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Print the number of SQL statements per request for every endpoint."""
+    if not QUERY_REPORT:
+        return
+    terminalreporter.section("queries per request")
+    width = max(len(endpoint) for endpoint in QUERY_REPORT)
+    terminalreporter.write_line(f"{'endpoint':{width}}  requests  max   mean")
+    for endpoint, counts in sorted(QUERY_REPORT.items()):
+        terminalreporter.write_line(
+            f"{endpoint:{width}}  {len(counts):8}  {max(counts):3}  "
+            f"{sum(counts) / len(counts):5.2f}"
+        )
@@ -1,22 +1,117 @@
 # Standard library imports
-from sqlalchemy import create_engine
+import asyncio
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from sqlalchemy import event
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.pool import StaticPool
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 import pytest
 
 # Local imports
-from eggs.db import init_db
+from eggs.db import apply_sqlite_pragmas, init_db, sqlite_pragmas
+
+
+# Queries per request by endpoint over the whole test session, reported by
+# pytest_terminal_summary in conftest.py
+QUERY_REPORT: dict[str, list[int]] = defaultdict(list)
+
+
+class QueryCounter:
+    """
+    Records the SQL statements executed on an engine, grouped per request.
+
+    The test client's get_db override calls `start` with the endpoint of each
+    request and `finish` once it was served, so every statement is attributed
+    to the request that issued it. Statements between requests (startup,
+    background tasks, the tests' own queries) belong to none.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.statements: list[str] = []
+        # Each statement with the parameters of its first execution
+        self.executed: dict[str, Any] = {}
+        self.requests: list[tuple[str, list[str]]] = []
+        self._current: Optional[list[str]] = None
+        event.listen(engine.sync_engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        if executemany and isinstance(parameters[0], (tuple, list, dict)):
+            parameters = parameters[0]
+        self.executed.setdefault(statement, parameters)
+        if self._current is not None:
+            self._current.append(statement)
+
+    def start(self, endpoint: str) -> None:
+        """Attribute the statements that follow to a new request."""
+        self._current = []
+        self.requests.append((endpoint, self._current))
+
+    def finish(self) -> None:
+        """Stop attributing statements to the current request."""
+        self._current = None
+
+    def close(self) -> None:
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self._record)
+        for endpoint, statements in self.requests:
+            QUERY_REPORT[endpoint].append(len(statements))
+
+    @contextmanager
+    def assert_max_queries(self, maximum: int, endpoint: Optional[str] = None):
+        """
+        Fail if the block executes more than `maximum` statements.
+
+        Args:
+            maximum: The query budget of the block
+            endpoint: Only count requests to this endpoint, e.g.
+                "POST /api/v1/lists/{name}"
+        """
+        first = len(self.requests)
+        before = len(self.statements)
+        yield
+        if endpoint is None:
+            statements = self.statements[before:]
+        else:
+            statements = [
+                statement
+                for name, executed in self.requests[first:]
+                if name == endpoint
+                for statement in executed
+            ]
+        assert len(statements) <= maximum, (
+            f"{len(statements)} queries executed, budget is {maximum}:\n"
+            + "\n".join(statements)
+        )
+
+
+async def _create_schema(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(init_db)
 
 
 @pytest.fixture
 def db_session():
-    engine = create_engine(
-        "sqlite:///:memory:",
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
         echo=True,
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+    apply_sqlite_pragmas(engine, sqlite_pragmas())
+
+    asyncio.run(_create_schema(engine))
+    session = AsyncSession(engine, expire_on_commit=False)
+    yield session
+    asyncio.run(engine.dispose())
 
-    init_db(engine)
-    with Session(engine) as session:
-        yield session
+
+@pytest.fixture
+def query_counter(db_session):
+    counter = QueryCounter(db_session.bind)
+    yield counter
+    counter.close()
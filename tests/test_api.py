@@ -1,20 +1,41 @@
+import asyncio
+import base64
+import re
+from unittest.mock import patch
+
 import pytest
 
 from eggs.api import app
+from fastapi import Request
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from eggs.db import get_db
-from tests.db import db_session
+from eggs.cache import list_cache
+from eggs.db import ItemModel, ListModel, get_db
+from eggs.events import broker
+from tests.db import db_session, query_counter  # noqa: F401
 
 
 @pytest.fixture
-def client(db_session):
-    def override_get_db():
-        yield db_session
+def client(db_session, query_counter):
+    def override_get_db(request: Request):
+        query_counter.start(f"{request.method} {request.scope['route'].path}")
+        try:
+            yield db_session
+        finally:
+            query_counter.finish()
 
     app.dependency_overrides[get_db] = override_get_db
+    list_cache.clear()
+    broker.clear()
 
-    with TestClient(app) as client:
+    # Background work at startup and in the lifespan uses the test database too
+    test_sessions = async_sessionmaker(
+        db_session.bind, class_=AsyncSession, expire_on_commit=False
+    )
+    with patch("eggs.api.async_session", test_sessions), TestClient(app) as client:
         yield client
 
     app.dependency_overrides.clear()
@@ -190,6 +211,22 @@ def test_cascade_delete_items(client):
     assert response.status_code == 404
 
 
+def test_delete_list_cascades_in_database(client, db_session):
+    """Test that deleting a list removes its items without loading them"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=[f"item-{n}" for n in range(50)])
+    client.post("/api/v1/lists/other")
+    client.post("/api/v1/lists/other/items/milk")
+
+    response = client.delete("/api/v1/lists/shopping")
+    assert response.status_code == 200
+
+    async def remaining_items():
+        return (await db_session.exec(select(ItemModel.name))).all()
+
+    assert asyncio.run(remaining_items()) == ["milk"]
+
+
 def test_create_list_empty_name(client):
     """Test creating a list with an empty name fails"""
     # Test with the correct endpoint, but since we can't pass name as a parameter
@@ -363,3 +400,551 @@ def test_update_item_nonexistent(client):
     )
     assert response.status_code == 404
     assert response.json() == {"detail": "Item not found"}
+
+
+def test_update_item_nonexistent_list(client):
+    """Test updating an item in a non-existent list reports the list"""
+    response = client.put(
+        "/api/v1/lists/nonexistent/items/milk", json={"is_in_cart": True}
+    )
+    assert response.status_code == 404
+    assert response.json() == {"detail": "List not found: nonexistent"}
+
+
+def test_update_item_without_returning(client, db_session):
+    """Test the UPDATE + SELECT fallback of a single item update"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items/milk")
+
+    dialect = db_session.get_bind().dialect
+    with patch.object(dialect, "update_returning", False):
+        response = client.put(
+            "/api/v1/lists/shopping/items/milk", json={"is_in_cart": True}
+        )
+    assert response.json() == {
+        "id": 1,
+        "list_id": 1,
+        "name": "milk",
+        "is_in_cart": True,
+    }
+
+
+def test_read_lists_paginated(client):
+    """Test paging through lists with limit and cursor"""
+    for name in ["a", "b", "c"]:
+        client.post(f"/api/v1/lists/{name}")
+
+    response = client.get("/api/v1/lists/", params={"limit": 2})
+    assert response.status_code == 200
+    assert response.json() == ["a", "b"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/api/v1/lists/", params={"limit": 2, "cursor": cursor})
+    assert response.status_code == 200
+    assert response.json() == ["c"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_read_items_paginated(client):
+    """Test paging through the items of a list with limit and cursor"""
+    client.post("/api/v1/lists/shopping")
+    for name in ["milk", "eggs", "bread", "butter"]:
+        client.post(f"/api/v1/lists/shopping/items/{name}")
+
+    items = []
+    params = {"limit": 3}
+    while True:
+        response = client.get("/api/v1/lists/shopping/items/", params=params)
+        assert response.status_code == 200
+        assert len(response.json()) <= 3
+        items += response.json()
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    assert items == ["milk", "eggs", "bread", "butter"]
+
+
+def test_read_items_page_size_capped(client):
+    """Test that the page size is capped at MAX_PAGE_SIZE"""
+    with patch("eggs.api.MAX_PAGE_SIZE", 2):
+        client.post("/api/v1/lists/shopping")
+        for name in ["milk", "eggs", "bread"]:
+            client.post(f"/api/v1/lists/shopping/items/{name}")
+        response = client.get("/api/v1/lists/shopping/items/", params={"limit": 500})
+    assert response.json() == ["milk", "eggs"]
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_read_items_invalid_cursor(client):
+    """Test that a malformed cursor is rejected"""
+    client.post("/api/v1/lists/shopping")
+    response = client.get("/api/v1/lists/shopping/items/", params={"cursor": "!!"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_read_lists_out_of_range_cursor(client):
+    """Test that cursors holding ids no database column can store are rejected"""
+    for value in ("9" * 30, str(2**63), "-1"):
+        cursor = base64.urlsafe_b64encode(value.encode()).decode()
+        response = client.get("/api/v1/lists/", params={"cursor": cursor})
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Invalid cursor"}
+    cursor = base64.urlsafe_b64encode(str(2**63 - 1).encode()).decode()
+    assert client.get("/api/v1/lists/", params={"cursor": cursor}).json() == []
+
+
+def test_create_items_bulk(client):
+    """Test creating many items at once reports created and duplicate names"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items/milk")
+
+    response = client.post(
+        "/api/v1/lists/shopping/items", json=["eggs", "milk", "bread", "eggs"]
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 2, "name": "eggs", "status": "created"},
+        {"id": 1, "name": "milk", "status": "duplicate"},
+        {"id": 3, "name": "bread", "status": "created"},
+        {"id": 2, "name": "eggs", "status": "duplicate"},
+    ]
+    assert client.get("/api/v1/lists/shopping/items/").json() == [
+        "milk",
+        "eggs",
+        "bread",
+    ]
+
+
+def test_create_items_bulk_invalid_name(client):
+    """Test that one invalid name rejects the whole bulk request"""
+    client.post("/api/v1/lists/shopping")
+    response = client.post("/api/v1/lists/shopping/items", json=["eggs", "bad@name"])
+    assert response.status_code == 422
+    assert client.get("/api/v1/lists/shopping/items/").json() == []
+
+
+def test_create_items_bulk_empty(client):
+    """Test that creating no items succeeds without changing the list"""
+    client.post("/api/v1/lists/shopping")
+    etag = client.get("/api/v1/lists/shopping/items/").headers["ETag"]
+    response = client.post("/api/v1/lists/shopping/items", json=[])
+    assert response.status_code == 200
+    assert response.json() == []
+    assert client.get("/api/v1/lists/shopping/items/").headers["ETag"] == etag
+
+
+def test_create_items_bulk_nonexistent_list(client):
+    """Test bulk creating items in a non-existent list fails"""
+    response = client.post("/api/v1/lists/nonexistent/items", json=["eggs"])
+    assert response.status_code == 404
+
+
+def test_create_list_on_conflict_ignore(client):
+    """Test that on_conflict=ignore returns 201 when created, 200 when existing"""
+    created = client.post("/api/v1/lists/todo?on_conflict=ignore")
+    assert created.status_code == 201
+    existing = client.post("/api/v1/lists/todo?on_conflict=ignore")
+    assert existing.status_code == 200
+    assert existing.json() == created.json() == {"id": 1, "name": "todo"}
+
+
+def test_create_item_on_conflict_ignore(client):
+    """Test that retrying an item create with on_conflict=ignore is harmless"""
+    client.post("/api/v1/lists/shopping")
+    created = client.post("/api/v1/lists/shopping/items/milk?on_conflict=ignore")
+    assert created.status_code == 201
+    etag = client.get("/api/v1/lists/shopping/items/").headers["ETag"]
+
+    existing = client.post("/api/v1/lists/shopping/items/milk?on_conflict=ignore")
+    assert existing.status_code == 200
+    assert existing.json() == created.json()
+    # Nothing changed, so the list version did not move either
+    assert client.get("/api/v1/lists/shopping/items/").headers["ETag"] == etag
+
+
+def test_create_item_invalid_on_conflict(client):
+    """Test that unknown on_conflict modes are rejected"""
+    client.post("/api/v1/lists/shopping")
+    response = client.post("/api/v1/lists/shopping/items/milk?on_conflict=replace")
+    assert response.status_code == 422
+
+
+def test_create_without_on_conflict_support(client, db_session):
+    """Test the savepoint fallback for dialects without ON CONFLICT"""
+    dialect = db_session.get_bind().dialect
+    with patch.dict("eggs.api.CONFLICT_INSERTS", clear=True):
+        assert client.post("/api/v1/lists/shopping").status_code == 200
+        assert client.post("/api/v1/lists/shopping").status_code == 409
+        with patch.object(dialect, "insert_returning", False):
+            client.post("/api/v1/lists/shopping/items/milk")
+            response = client.post(
+                "/api/v1/lists/shopping/items", json=["eggs", "milk"]
+            )
+    assert response.json() == [
+        {"id": 2, "name": "eggs", "status": "created"},
+        {"id": 1, "name": "milk", "status": "duplicate"},
+    ]
+
+
+def test_update_items_bulk_by_name(client):
+    """Test setting the cart flag on a set of named items"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=["milk", "eggs", "bread"])
+
+    response = client.put(
+        "/api/v1/lists/shopping/items",
+        json={"is_in_cart": True, "names": ["bread", "milk", "nonexistent"]},
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": 1, "list_id": 1, "name": "milk", "is_in_cart": True},
+        {"id": 3, "list_id": 1, "name": "bread", "is_in_cart": True},
+    ]
+    assert client.get("/api/v1/lists/shopping/items/eggs").json()["is_in_cart"] is False
+
+
+def test_update_items_bulk_all(client):
+    """Test clearing the cart flag on every item in a list"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/todo")
+    client.post("/api/v1/lists/shopping/items", json=["milk", "eggs"])
+    client.post("/api/v1/lists/todo/items", json=["milk"])
+    client.put("/api/v1/lists/todo/items", json={"is_in_cart": True})
+
+    response = client.put("/api/v1/lists/shopping/items", json={"is_in_cart": True})
+    assert response.status_code == 200
+    assert [item["is_in_cart"] for item in response.json()] == [True, True]
+
+    response = client.put("/api/v1/lists/shopping/items", json={"is_in_cart": False})
+    assert [item["is_in_cart"] for item in response.json()] == [False, False]
+    assert client.get("/api/v1/lists/todo/items/milk").json()["is_in_cart"] is True
+
+
+def test_update_items_bulk_nonexistent_list(client):
+    """Test bulk updating items in a non-existent list fails"""
+    response = client.put("/api/v1/lists/nonexistent/items", json={"is_in_cart": True})
+    assert response.status_code == 404
+
+
+def test_update_items_bulk_without_returning(client, db_session):
+    """Test the UPDATE + SELECT fallback for dialects without RETURNING"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=["milk", "eggs"])
+
+    dialect = db_session.get_bind().dialect
+    with patch.object(dialect, "update_returning", False):
+        response = client.put(
+            "/api/v1/lists/shopping/items",
+            json={"is_in_cart": True, "names": ["eggs"]},
+        )
+    assert response.json() == [
+        {"id": 2, "list_id": 1, "name": "eggs", "is_in_cart": True}
+    ]
+
+
+def test_get_list(client):
+    """Test getting a list without its items"""
+    client.post("/api/v1/lists/shopping")
+    response = client.get("/api/v1/lists/shopping")
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "name": "shopping"}
+
+
+def test_get_list_include_items(client):
+    """Test getting a list together with all of its items"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=["milk", "eggs"])
+    client.put("/api/v1/lists/shopping/items/eggs", json={"is_in_cart": True})
+
+    response = client.get("/api/v1/lists/shopping", params={"include": "items"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "id": 1,
+        "name": "shopping",
+        "items": [
+            {"id": 1, "list_id": 1, "name": "milk", "is_in_cart": False},
+            {"id": 2, "list_id": 1, "name": "eggs", "is_in_cart": True},
+        ],
+    }
+
+
+def test_get_list_include_items_empty(client):
+    """Test getting an empty list together with its items"""
+    client.post("/api/v1/lists/shopping")
+    response = client.get("/api/v1/lists/shopping", params={"include": "items"})
+    assert response.json() == {"id": 1, "name": "shopping", "items": []}
+
+
+def test_get_list_include_items_pagination(client):
+    """Test that the embedded items are paginated like the item collection"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=["milk", "eggs", "bread"])
+
+    response = client.get(
+        "/api/v1/lists/shopping", params={"include": "items", "limit": 2}
+    )
+    assert [item["name"] for item in response.json()["items"]] == ["milk", "eggs"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(
+        "/api/v1/lists/shopping",
+        params={"include": "items", "limit": 2, "cursor": cursor},
+    )
+    assert response.json()["name"] == "shopping"
+    assert [item["name"] for item in response.json()["items"]] == ["bread"]
+    assert "X-Next-Cursor" not in response.headers
+
+    with patch("eggs.api.MAX_PAGE_SIZE", 1):
+        response = client.get(
+            "/api/v1/lists/shopping", params={"include": "items", "limit": 100}
+        )
+    assert len(response.json()["items"]) == 1
+
+    response = client.get(
+        "/api/v1/lists/shopping", params={"include": "items", "cursor": "!"}
+    )
+    assert response.status_code == 400
+
+
+def test_get_list_nonexistent(client):
+    """Test getting a non-existent list fails, with or without items"""
+    assert client.get("/api/v1/lists/nonexistent").status_code == 404
+    response = client.get("/api/v1/lists/nonexistent", params={"include": "items"})
+    assert response.status_code == 404
+
+
+def test_item_operations_use_list_cache(client):
+    """Test that item operations resolve the list name from the cache"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items/milk")
+    client.delete("/api/v1/lists/shopping/items/milk")
+
+    assert client.get("/api/v1/cache").json() == {"hits": 2, "misses": 0, "size": 1}
+
+
+def test_list_cache_invalidated_on_delete(client):
+    """Test that a deleted and recreated list is not served from a stale cache"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/todo")
+    client.post("/api/v1/lists/shopping/items/milk")
+    client.delete("/api/v1/lists/shopping")
+
+    assert client.post("/api/v1/lists/shopping/items/milk").status_code == 404
+    client.post("/api/v1/lists/shopping")
+    response = client.post("/api/v1/lists/shopping/items/milk")
+    assert response.status_code == 200
+    assert response.json()["list_id"] == 3
+
+
+def test_create_item_stale_cached_list(client):
+    """Test that a list deleted elsewhere while cached here answers 404"""
+    list_cache.set("shopping", 42)
+    assert client.post("/api/v1/lists/shopping/items/milk").status_code == 404
+    assert client.post("/api/v1/lists/shopping/items", json=["milk"]).status_code == 404
+    assert list_cache.get("shopping") is None
+
+
+def test_stale_cached_list_id_of_another_list(client):
+    """Test that a cached id taken over by another list is not written to"""
+    client.post("/api/v1/lists/shop")
+    client.post("/api/v1/lists/shop/items/milk")
+    client.post("/api/v1/lists/shop/items/bread")
+    # Deleted and reused elsewhere, while this worker still caches shop -> 1
+    with patch.object(list_cache, "invalidate"):
+        client.delete("/api/v1/lists/shop")
+        assert client.post("/api/v1/lists/work").json()["id"] == 1
+    assert list_cache.get("shop") == 1
+
+    assert client.post("/api/v1/lists/shop/items/beer").status_code == 404
+    list_cache.set("shop", 1)
+    response = client.put("/api/v1/lists/shop/items", json={"is_in_cart": True})
+    assert response.status_code == 404
+    client.post("/api/v1/lists/work/items/milk")
+    list_cache.set("shop", 1)
+    assert client.delete("/api/v1/lists/shop/items/milk").status_code == 404
+    assert client.get("/api/v1/lists/work/items/milk").json()["is_in_cart"] is False
+
+    # Recreated under a new id: the stale entry is replaced
+    client.post("/api/v1/lists/shop")
+    list_cache.set("shop", 1)
+    response = client.post("/api/v1/lists/shop/items/beer")
+    assert response.json()["list_id"] == 2
+    assert list_cache.get("shop") == 2
+    assert client.get("/api/v1/lists/work/items/").json() == ["milk"]
+
+
+def test_read_items_etag(client):
+    """Test that unchanged items are answered with 304 Not Modified"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items/milk")
+
+    response = client.get("/api/v1/lists/shopping/items/")
+    etag = response.headers["ETag"]
+    assert re.fullmatch(r'"[1-9][0-9]*-1"', etag)
+
+    response = client.get(
+        "/api/v1/lists/shopping/items/", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
+def test_read_items_etag_changes_on_mutation(client):
+    """Test that creating, updating and deleting items changes the ETag"""
+    client.post("/api/v1/lists/shopping")
+    etags = [client.get("/api/v1/lists/shopping/items/").headers["ETag"]]
+
+    client.post("/api/v1/lists/shopping/items/milk")
+    etags.append(client.get("/api/v1/lists/shopping/items/").headers["ETag"])
+    client.put("/api/v1/lists/shopping/items/milk", json={"is_in_cart": True})
+    etags.append(client.get("/api/v1/lists/shopping/items/").headers["ETag"])
+    client.delete("/api/v1/lists/shopping/items/milk")
+    etags.append(client.get("/api/v1/lists/shopping/items/").headers["ETag"])
+    client.post("/api/v1/lists/shopping/items", json=["eggs", "bread"])
+    etags.append(client.get("/api/v1/lists/shopping/items/").headers["ETag"])
+    client.put("/api/v1/lists/shopping/items", json={"is_in_cart": True})
+    etags.append(client.get("/api/v1/lists/shopping/items/").headers["ETag"])
+
+    instance = etags[0].split("-")[0]
+    assert etags == [f'{instance}-{version}"' for version in range(6)]
+    response = client.get(
+        "/api/v1/lists/shopping/items/", headers={"If-None-Match": etags[-2]}
+    )
+    assert response.status_code == 200
+    assert response.json() == ["eggs", "bread"]
+
+
+def test_read_items_etag_not_shared_between_lists(client):
+    """Test that the ETag of one list does not match another list"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/todo")
+    etag = client.get("/api/v1/lists/shopping/items/").headers["ETag"]
+    response = client.get("/api/v1/lists/todo/items/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+def test_read_items_etag_not_shared_with_recreated_list(client):
+    """Test that a list created again does not match the ETag of the old one"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items/milk")
+    etag = client.get("/api/v1/lists/shopping/items/").headers["ETag"]
+
+    client.delete("/api/v1/lists/shopping")
+    assert client.post("/api/v1/lists/shopping").json()["id"] == 1
+    client.post("/api/v1/lists/shopping/items/beer")
+    response = client.get(
+        "/api/v1/lists/shopping/items/", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json() == ["beer"]
+
+
+def test_get_item_etag(client):
+    """Test conditional GET of a single item and of the list snapshot"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items/milk")
+
+    etag = client.get("/api/v1/lists/shopping/items/milk").headers["ETag"]
+    response = client.get(
+        "/api/v1/lists/shopping/items/milk", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    response = client.get(
+        "/api/v1/lists/shopping",
+        params={"include": "items"},
+        headers={"If-None-Match": f"W/{etag}"},
+    )
+    assert response.status_code == 304
+
+
+def test_list_events_replay(client):
+    """Test that the event stream replays changes after Last-Event-ID"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items/milk")
+    client.put("/api/v1/lists/shopping/items/milk", json={"is_in_cart": True})
+    client.delete("/api/v1/lists/shopping/items/milk")
+
+    with patch.object(broker, "max_stream_seconds", 0.1):
+        with client.stream(
+            "GET", "/api/v1/lists/shopping/events", headers={"Last-Event-ID": "1"}
+        ) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            body = response.read().decode()
+
+    milk = '"id": 1, "list_id": 1, "name": "milk"'
+    assert "event: created" not in body
+    assert f'id: 2\nevent: updated\ndata: [{{{milk}, "is_in_cart": true}}]' in body
+    assert f'id: 3\nevent: deleted\ndata: [{{{milk}, "is_in_cart": true}}]' in body
+
+
+def test_list_events_nonexistent_list(client):
+    """Test subscribing to the events of a non-existent list fails"""
+    response = client.get("/api/v1/lists/nonexistent/events")
+    assert response.status_code == 404
+
+
+# Query budgets: the number of SQL statements each endpoint may issue, with a
+# cold list cache and several items in the list so that N+1 patterns show up.
+QUERY_BUDGETS = [
+    ("post", "/api/v1/lists/other", None, 1),
+    ("get", "/api/v1/lists/", None, 1),
+    ("get", "/api/v1/lists/groceries?include=items", None, 1),
+    ("post", "/api/v1/lists/groceries/items/bread", None, 3),
+    ("post", "/api/v1/lists/groceries/items", ["bread", "eggs", "item-1"], 4),
+    ("get", "/api/v1/lists/groceries/items/", None, 2),
+    ("get", "/api/v1/lists/groceries/items/item-1", None, 1),
+    ("get", "/api/v1/lists/groceries/changes?since=1&instance={instance}", None, 3),
+    ("get", "/api/v1/search?q=item", None, 1),
+    ("put", "/api/v1/lists/groceries/items/item-1", {"is_in_cart": True}, 2),
+    ("put", "/api/v1/lists/groceries/items", {"is_in_cart": True}, 4),
+    ("delete", "/api/v1/lists/groceries/items/item-1", None, 4),
+    ("delete", "/api/v1/lists/groceries", None, 1),
+]
+
+
+@pytest.mark.parametrize("method, url, body, budget", QUERY_BUDGETS)
+def test_query_budget(client, query_counter, method, url, body, budget):
+    """Test that endpoints stay within their query budget"""
+    client.post("/api/v1/lists/groceries")
+    client.post(
+        "/api/v1/lists/groceries/items",
+        json=[f"item-{n}" for n in range(20)],
+    )
+    changes = client.get("/api/v1/lists/groceries/changes?since=0").json()
+    list_cache.clear()
+
+    kwargs = {"json": body} if body is not None else {}
+    with query_counter.assert_max_queries(budget):
+        response = client.request(
+            method, url.format(instance=changes["instance"]), **kwargs
+        )
+    assert response.status_code < 400
+
+
+def test_query_budget_exceeded(client, query_counter):
+    """Test that the query budget helper reports the statements over budget"""
+    client.post("/api/v1/lists/groceries")
+    with pytest.raises(AssertionError, match="2 queries executed, budget is 0"):
+        with query_counter.assert_max_queries(
+            0, endpoint="GET /api/v1/lists/{list_name}/items/"
+        ):
+            client.get("/api/v1/lists/")
+            client.get("/api/v1/lists/groceries/items/")
+
+
+def test_query_counter_windows(client, db_session, query_counter):
+    """Test that statements outside requests are attributed to none of them"""
+    client.post("/api/v1/lists/groceries")
+
+    async def query():
+        await db_session.exec(select(ListModel.id))
+
+    asyncio.run(query())
+    client.delete("/api/v1/lists/groceries")
+    asyncio.run(query())
+    assert [len(statements) for _, statements in query_counter.requests] == [1, 1]
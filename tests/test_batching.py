@@ -0,0 +1,207 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from sqlalchemy import event, insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from eggs.api import app
+from eggs.batching import WriteBatcher
+from eggs.cache import list_cache
+from eggs.db import ItemModel, ListModel, create_db_engine, get_db, init_db
+from eggs.metrics import WRITE_BATCH_SIZE
+
+
+@pytest.fixture
+def database(tmp_path):
+    """A SQLite file database and a list of the transactions committed on it."""
+    engine = create_db_engine(f"sqlite+aiosqlite:///{tmp_path}/batch.db")
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(init_db)
+
+    asyncio.run(create())
+    commits = []
+    event.listen(engine.sync_engine, "commit", lambda conn: commits.append(conn))
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+    yield session_factory, commits
+    asyncio.run(engine.dispose())
+
+
+def create_list(name: str):
+    async def operation(db: AsyncSession) -> int:
+        result = await db.exec(insert(ListModel).values(name=name))
+        return result.inserted_primary_key[0]
+
+    return operation
+
+
+async def run_batches(batcher: WriteBatcher, *operations) -> list:
+    task = asyncio.create_task(batcher.run())
+    try:
+        return await asyncio.gather(
+            *(batcher.submit(operation) for operation in operations),
+            return_exceptions=True,
+        )
+    finally:
+        task.cancel()
+
+
+async def list_names(session_factory) -> list[str]:
+    async with session_factory() as db:
+        names = await db.exec(select(ListModel.name).order_by(ListModel.id))
+        return list(names.all())
+
+
+def test_concurrent_writes_share_a_commit(database):
+    """Test that operations queued together are committed in one transaction"""
+    session_factory, commits = database
+    batcher = WriteBatcher(session_factory, max_delay=10, max_size=10)
+    batches_before = WRITE_BATCH_SIZE._sum.get()
+
+    results = asyncio.run(
+        run_batches(batcher, *(create_list(f"list-{n}") for n in range(10)))
+    )
+    assert results == list(range(1, 11))
+    assert len(commits) == 1
+    assert WRITE_BATCH_SIZE._sum.get() - batches_before == 10
+    assert asyncio.run(list_names(session_factory)) == [f"list-{n}" for n in range(10)]
+
+
+def test_batch_max_size(database):
+    """Test that a batch is committed once it holds max_size operations"""
+    session_factory, commits = database
+    batcher = WriteBatcher(session_factory, max_delay=1, max_size=4)
+    asyncio.run(run_batches(batcher, *(create_list(f"list-{n}") for n in range(10))))
+    assert len(commits) == 3
+
+
+def test_failed_operation_only_undoes_itself(database):
+    """Test that an operation's error reaches its caller and spares the batch"""
+    session_factory, commits = database
+    batcher = WriteBatcher(session_factory, max_delay=10, max_size=3)
+
+    async def create_twice(db: AsyncSession) -> None:
+        await create_list("twice")(db)
+        await create_list("twice")(db)
+
+    results = asyncio.run(
+        run_batches(batcher, create_list("first"), create_twice, create_list("last"))
+    )
+    assert results[0] == 1
+    assert isinstance(results[1], IntegrityError)
+    assert results[2] is not None
+    assert len(commits) == 1
+    assert asyncio.run(list_names(session_factory)) == ["first", "last"]
+
+
+def test_api_writes_are_batched(database):
+    """Test that concurrent item writes through the API are committed together"""
+    session_factory, commits = database
+    # Batches are only committed once full, so their size decides the commits
+    batcher = WriteBatcher(session_factory, max_delay=10, max_size=8)
+
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+
+    async def exercise():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            await ac.post("/api/v1/lists/shopping")
+            await ac.post("/api/v1/lists/shopping/items", json=["milk"])
+            commits.clear()
+
+            task = asyncio.create_task(batcher.run())
+            names = [f"item-{n}" for n in range(8)]
+            created = await asyncio.gather(
+                *(ac.post(f"/api/v1/lists/shopping/items/{name}") for name in names)
+            )
+            batcher.max_size = 3
+            toggled, missing, duplicate = await asyncio.gather(
+                ac.put("/api/v1/lists/shopping/items/milk", json={"is_in_cart": True}),
+                ac.put("/api/v1/lists/shopping/items/bread", json={"is_in_cart": True}),
+                ac.post("/api/v1/lists/shopping/items/milk"),
+            )
+            task.cancel()
+            return created, toggled, missing, duplicate
+
+    app.dependency_overrides[get_db] = override_get_db
+    list_cache.clear()
+    try:
+        with patch("eggs.batching.batchers", [batcher]):
+            created, toggled, missing, duplicate = asyncio.run(exercise())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [response.status_code for response in created] == [200] * 8
+    assert toggled.json()["is_in_cart"] is True
+    assert missing.status_code == 404
+    assert duplicate.status_code == 409
+    assert len(commits) == 2
+
+    async def items():
+        async with session_factory() as db:
+            return (await db.exec(select(ItemModel.name))).all()
+
+    assert len(asyncio.run(items())) == 9
+
+
+def test_failed_batch_start_fails_all_operations(database):
+    """Test that every queued caller gets the error when a batch can't be opened"""
+    session_factory, commits = database
+    failures = [RuntimeError("no session")]
+
+    def failing_factory():
+        if failures:
+            raise failures.pop()
+        return session_factory()
+
+    batcher = WriteBatcher(failing_factory, max_delay=0.05)
+
+    async def exercise():
+        return await asyncio.wait_for(
+            run_batches(batcher, create_list("a"), create_list("b")), 2
+        )
+
+    first, second = asyncio.run(exercise())
+    assert isinstance(first, RuntimeError)
+    # Queued behind the failed batch, so it runs in the next one
+    assert second == 1
+    assert asyncio.run(list_names(session_factory)) == ["b"]
+
+
+def test_locked_database_fails_batch(database, tmp_path):
+    """Test that a write lock held elsewhere fails the batch instead of hanging"""
+    session_factory, commits = database
+    # Without the busy_timeout pragma, so BEGIN gives up after 0.1 s
+    engine = create_db_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/batch.db",
+        sqlite_profile="default",
+        connect_args={"timeout": 0.1},
+    )
+    batcher = WriteBatcher(
+        async_sessionmaker(engine, class_=AsyncSession), max_delay=0.05
+    )
+
+    async def exercise():
+        async with session_factory() as holder:
+            await holder.exec(insert(ListModel).values(name="holder"))
+            try:
+                return await asyncio.wait_for(
+                    run_batches(batcher, create_list("a"), create_list("b")), 2
+                )
+            finally:
+                await holder.rollback()
+                await engine.dispose()
+
+    results = asyncio.run(exercise())
+    assert [type(result) for result in results] == [OperationalError] * 2
+    assert "locked" in str(results[0])
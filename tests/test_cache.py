@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+from eggs.cache import ListCache
+
+
+def test_hit_and_miss_counters():
+    """Test that lookups are counted as hits and misses"""
+    cache = ListCache()
+    assert cache.get("shopping") is None
+    cache.set("shopping", 1)
+    assert cache.get("shopping") == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_least_recently_used_entry_evicted():
+    """Test that the cache stays within maxsize by evicting the LRU entry"""
+    cache = ListCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_entries_expire_after_ttl():
+    """Test that entries older than the TTL are misses"""
+    cache = ListCache(ttl=10)
+    with patch("eggs.cache.time.monotonic", return_value=100.0):
+        cache.set("shopping", 1)
+    with patch("eggs.cache.time.monotonic", return_value=109.0):
+        assert cache.get("shopping") == 1
+    with patch("eggs.cache.time.monotonic", return_value=111.0):
+        assert cache.get("shopping") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_invalidate_through_epoch_file(tmp_path):
+    """Test that invalidating in one worker clears the cache of another"""
+    epoch_file = str(tmp_path / "epoch")
+    worker1 = ListCache(epoch_file=epoch_file)
+    worker2 = ListCache(epoch_file=epoch_file)
+    worker1.set("shopping", 1)
+    worker2.set("shopping", 1)
+    worker2.set("todo", 2)
+
+    worker1.invalidate("shopping")
+    assert worker1.get("shopping") is None
+    assert worker2.get("shopping") is None
+    assert worker2.get("todo") is None
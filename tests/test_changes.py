@@ -0,0 +1,144 @@
+import asyncio
+from datetime import timedelta
+from typing import Optional
+
+from sqlmodel import select
+
+from eggs.db import ItemTombstoneModel, ListModel
+from eggs.tombstones import compact_tombstones
+from tests.db import db_session, query_counter  # noqa: F401
+from tests.test_api import client  # noqa: F401
+
+
+def changes(client, since: int, instance: Optional[int] = None):
+    params = {"since": since}
+    if instance is not None:
+        params["instance"] = instance
+    return client.get("/api/v1/lists/shopping/changes", params=params)
+
+
+def test_changes_since_zero(client):
+    """Test that since=0 returns every item with the version of its last change"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=["milk", "eggs"])
+    client.put("/api/v1/lists/shopping/items/eggs", json={"is_in_cart": True})
+
+    response = changes(client, 0)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["instance"] > 0
+    assert body == {
+        "instance": body["instance"],
+        "version": 2,
+        "items": [
+            {"id": 1, "list_id": 1, "name": "milk", "is_in_cart": False, "version": 1},
+            {"id": 2, "list_id": 1, "name": "eggs", "is_in_cart": True, "version": 2},
+        ],
+        "deleted": [],
+    }
+
+
+def test_changes_since_version(client):
+    """Test that only items changed after the given version are returned"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=["milk", "eggs", "bread"])
+    synced = changes(client, 0).json()
+    instance, version = synced["instance"], synced["version"]
+
+    client.put("/api/v1/lists/shopping/items/milk", json={"is_in_cart": True})
+    client.delete("/api/v1/lists/shopping/items/eggs")
+    client.post("/api/v1/lists/shopping/items/butter")
+    client.delete("/api/v1/lists/shopping/items/bread")
+    client.post("/api/v1/lists/shopping/items/bread")
+
+    body = changes(client, version, instance).json()
+    assert body["version"] == version + 5
+    assert [item["name"] for item in body["items"]] == ["milk", "butter", "bread"]
+    assert body["items"][0]["is_in_cart"] is True
+    assert body["deleted"] == ["eggs", "bread"]
+
+    assert changes(client, body["version"], instance).json() == {
+        "instance": instance,
+        "version": body["version"],
+        "items": [],
+        "deleted": [],
+    }
+
+
+def test_changes_ignore_failed_writes(client):
+    """Test that writes that change nothing do not bump the version"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items/milk")
+
+    assert client.post("/api/v1/lists/shopping/items/milk").status_code == 409
+    client.post("/api/v1/lists/shopping/items/milk?on_conflict=ignore")
+    client.post("/api/v1/lists/shopping/items", json=["milk"])
+    client.put("/api/v1/lists/shopping/items/bread", json={"is_in_cart": True})
+    client.put("/api/v1/lists/shopping/items", json={"is_in_cart": True, "names": []})
+    client.delete("/api/v1/lists/shopping/items/bread")
+
+    assert changes(client, 0).json()["version"] == 1
+
+
+def test_changes_errors(client):
+    """Test unknown lists, versions from the future and invalid versions"""
+    assert changes(client, 0).status_code == 404
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items/milk")
+    instance = changes(client, 0).json()["instance"]
+    assert changes(client, 2, instance).status_code == 410
+    assert changes(client, 1).status_code == 400
+    assert changes(client, -1).status_code == 422
+    assert client.get("/api/v1/lists/shopping/changes").status_code == 422
+
+
+def test_changes_after_compaction(client, db_session):
+    """Test that clients older than the compacted tombstones must resync"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=["milk", "eggs"])
+    client.delete("/api/v1/lists/shopping/items/milk")
+    client.delete("/api/v1/lists/shopping/items/eggs")
+    instance = changes(client, 0).json()["instance"]
+
+    async def compact(max_age: timedelta) -> int:
+        return await compact_tombstones(db_session, max_age)
+
+    assert asyncio.run(compact(timedelta(days=1))) == 0
+    assert changes(client, 1, instance).json()["deleted"] == ["milk", "eggs"]
+
+    assert asyncio.run(compact(timedelta(0))) == 2
+
+    async def state():
+        list_obj = (await db_session.exec(select(ListModel))).one()
+        tombstones = (await db_session.exec(select(ItemTombstoneModel))).all()
+        return list_obj.compacted_version, tombstones
+
+    assert asyncio.run(state()) == (3, [])
+    assert changes(client, 1, instance).status_code == 410
+    assert changes(client, 2, instance).status_code == 410
+    assert changes(client, 3, instance).json() == {
+        "instance": instance,
+        "version": 3,
+        "items": [],
+        "deleted": [],
+    }
+    assert changes(client, 0).json()["items"] == []
+
+
+def test_changes_of_recreated_list(client):
+    """Test that a client synced with a deleted list must fetch the new one"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=["milk", "bread"])
+    synced = changes(client, 0).json()
+    assert synced["version"] == 1
+
+    client.delete("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=["a", "b"])
+    client.post("/api/v1/lists/shopping/items", json=["c", "d"])
+
+    response = changes(client, synced["version"], synced["instance"])
+    assert response.status_code == 410
+    body = changes(client, 0).json()
+    assert body["instance"] != synced["instance"]
+    assert [item["name"] for item in body["items"]] == ["a", "b", "c", "d"]
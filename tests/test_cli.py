@@ -0,0 +1,32 @@
+from eggs.api import parse_args, server_options
+
+
+def test_dev_mode_reloads_single_process(monkeypatch):
+    """Test that the default mode is a single auto-reloading process"""
+    monkeypatch.delenv("EGGS_ENV", raising=False)
+    options = server_options(parse_args([]))
+    assert options["reload"] is True
+    assert "workers" not in options
+
+
+def test_prod_mode_workers_default_to_cores(monkeypatch):
+    """Test that production mode disables reload and sizes workers to cores"""
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    monkeypatch.setattr("os.cpu_count", lambda: 6)
+    options = server_options(parse_args(["--prod"]))
+    assert "reload" not in options
+    assert options["workers"] == 6
+    assert options["loop"] in ("uvloop", "asyncio")
+    assert options["http"] in ("httptools", "h11")
+
+
+def test_prod_mode_from_environment(monkeypatch):
+    """Test that production settings can be supplied through the environment"""
+    monkeypatch.setenv("EGGS_ENV", "production")
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("EGGS_LIMIT_CONCURRENCY", "500")
+    monkeypatch.setenv("EGGS_GRACEFUL_TIMEOUT", "10")
+    options = server_options(parse_args([]))
+    assert options["workers"] == 3
+    assert options["limit_concurrency"] == 500
+    assert options["timeout_graceful_shutdown"] == 10
@@ -0,0 +1,68 @@
+import asyncio
+
+from eggs.db import create_db_engine, pool_options, sqlite_pragmas, to_async_url
+
+
+def test_to_async_url_sqlite():
+    """Test that plain sqlite URLs are switched to the aiosqlite driver"""
+    assert to_async_url("sqlite:///lists.db") == "sqlite+aiosqlite:///lists.db"
+
+
+def test_to_async_url_postgresql():
+    """Test that postgresql URLs are switched to the asyncpg driver"""
+    assert (
+        to_async_url("postgresql://eggs@localhost/eggs")
+        == "postgresql+asyncpg://eggs@localhost/eggs"
+    )
+
+
+def test_to_async_url_explicit_driver():
+    """Test that URLs which already name a driver are left untouched"""
+    assert (
+        to_async_url("sqlite+aiosqlite:///:memory:") == "sqlite+aiosqlite:///:memory:"
+    )
+
+
+def test_sqlite_performance_profile(tmp_path):
+    """Test that new SQLite connections get the performance pragmas"""
+
+    async def pragmas():
+        engine = create_db_engine(f"sqlite+aiosqlite:///{tmp_path}/eggs.db")
+        async with engine.connect() as conn:
+            journal_mode = (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+            synchronous = (await conn.exec_driver_sql("PRAGMA synchronous")).scalar()
+            busy_timeout = (await conn.exec_driver_sql("PRAGMA busy_timeout")).scalar()
+        await engine.dispose()
+        return journal_mode, synchronous, busy_timeout
+
+    # synchronous=NORMAL is reported as 1
+    assert asyncio.run(pragmas()) == ("wal", 1, 5000)
+
+
+def test_sqlite_pragma_env_override(monkeypatch):
+    """Test that individual pragmas can be overridden from the environment"""
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT", "10000")
+    assert sqlite_pragmas("performance")["busy_timeout"] == "10000"
+    assert sqlite_pragmas("default") == {"foreign_keys": "ON", "busy_timeout": "10000"}
+
+
+def test_sqlite_foreign_keys_enforced(tmp_path):
+    """Test that foreign keys are enforced, even with SQLite's default profile"""
+
+    async def foreign_keys():
+        engine = create_db_engine(
+            f"sqlite+aiosqlite:///{tmp_path}/eggs.db", sqlite_profile="default"
+        )
+        async with engine.connect() as conn:
+            enabled = (await conn.exec_driver_sql("PRAGMA foreign_keys")).scalar()
+        await engine.dispose()
+        return enabled
+
+    assert asyncio.run(foreign_keys()) == 1
+
+
+def test_pool_options(monkeypatch):
+    """Test that pool sizing comes from the environment, except for :memory:"""
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    assert pool_options("sqlite+aiosqlite:///lists.db")["pool_size"] == 20
+    assert pool_options("sqlite+aiosqlite:///:memory:") == {}
@@ -0,0 +1,129 @@
+import asyncio
+
+from eggs.db import ListModel
+from eggs.events import Event, ListEventBroker
+from tests.db import db_session  # noqa: F401
+
+
+async def collect(stream, count):
+    """Read `count` messages from an event stream, skipping the retry preamble"""
+    messages = []
+    async for message in stream:
+        if not message.startswith("retry:"):
+            messages.append(message)
+        if len(messages) == count:
+            break
+    await stream.aclose()
+    return messages
+
+
+def test_publish_fans_out_to_subscribers():
+    """Test that one published event reaches every subscriber of the list"""
+
+    async def run():
+        broker = ListEventBroker()
+        streams = [broker.stream("shopping", 0) for _ in range(100)]
+        readers = [asyncio.create_task(collect(stream, 1)) for stream in streams]
+        other = asyncio.create_task(collect(broker.stream("todo", 0), 1))
+        await asyncio.sleep(0)
+        assert broker.subscriber_count("shopping") == 100
+
+        broker.publish("shopping", Event(1, "created", [{"name": "milk"}]))
+        results = await asyncio.gather(*readers)
+        other.cancel()
+        return results
+
+    results = asyncio.run(run())
+    assert all(
+        messages == ['id: 1\nevent: created\ndata: [{"name": "milk"}]\n\n']
+        for messages in results
+    )
+
+
+def test_resume_from_last_event_id():
+    """Test that a reconnecting client gets the events it missed"""
+
+    async def run():
+        broker = ListEventBroker()
+        for version in (1, 2, 3):
+            broker.publish("shopping", Event(version, "updated", []))
+        return await collect(broker.stream("shopping", 3, last_event_id=1), 2)
+
+    assert [message.split("\n")[0] for message in asyncio.run(run())] == [
+        "id: 2",
+        "id: 3",
+    ]
+
+
+def test_resync_when_history_is_gone():
+    """Test that resuming from before the retained history asks for a resync"""
+
+    async def run():
+        broker = ListEventBroker(history_size=2)
+        for version in (1, 2, 3, 4):
+            broker.publish("shopping", Event(version, "updated", []))
+        return await collect(broker.stream("shopping", 4, last_event_id=1), 1)
+
+    assert asyncio.run(run()) == ["id: 4\nevent: resync\ndata: {}\n\n"]
+
+
+def test_heartbeat():
+    """Test that idle streams send comment heartbeats"""
+
+    async def run():
+        broker = ListEventBroker(heartbeat=0.01)
+        return await collect(broker.stream("shopping", 0), 2)
+
+    assert asyncio.run(run()) == [": heartbeat\n\n", ": heartbeat\n\n"]
+
+
+def test_slow_subscriber_is_resynced():
+    """Test that a subscriber whose queue overflows is told to resync"""
+
+    async def run():
+        broker = ListEventBroker(queue_size=1)
+        stream = broker.stream("shopping", 0)
+        await anext(stream)
+        reader = asyncio.create_task(collect(stream, 2))
+        await asyncio.sleep(0)
+        for version in (1, 2, 3):
+            broker.publish("shopping", Event(version, "updated", []))
+        return await reader
+
+    # The client resumes from id 0 and gets the events from the history
+    assert asyncio.run(run()) == ["id: 0\nevent: resync\ndata: {}\n\n"]
+
+
+def test_close_list_ends_streams():
+    """Test that deleting a list ends its streams after a list_deleted event"""
+
+    async def run():
+        broker = ListEventBroker()
+        broker.publish("shopping", Event(1, "created", []))
+        reader = asyncio.create_task(collect(broker.stream("shopping", 1), 5))
+        await asyncio.sleep(0)
+        broker.close_list("shopping")
+        messages = await reader
+        return messages, broker.subscriber_count()
+
+    messages, subscribers = asyncio.run(run())
+    assert messages == ['id: 2\nevent: list_deleted\ndata: {"name": "shopping"}\n\n']
+    assert subscribers == 0
+
+
+def test_watch_relays_changes_from_other_workers(db_session):
+    """Test that the version poller publishes a changed event for moved lists"""
+
+    async def run():
+        db_session.add(ListModel(name="shopping", version=5))
+        await db_session.commit()
+
+        broker = ListEventBroker()
+        broker.publish("shopping", Event(3, "created", []))
+        reader = asyncio.create_task(collect(broker.stream("shopping", 3), 1))
+        watcher = asyncio.create_task(broker.watch(lambda: db_session, 0.01))
+        messages = await reader
+        watcher.cancel()
+        return messages
+
+    assert asyncio.run(run()) == ["id: 5\nevent: changed\ndata: {}\n\n"]
@@ -0,0 +1,60 @@
+import json
+import logging
+
+from eggs.logs import JSONFormatter, access_logger
+from tests.test_api import client  # noqa: F401
+from tests.db import db_session, query_counter  # noqa: F401
+
+
+def access_records(caplog):
+    return [r for r in caplog.records if r.name == access_logger.name]
+
+
+def test_access_log_record(client, caplog):
+    """Test that each request produces one access record with its timing"""
+    with caplog.at_level(logging.INFO):
+        client.post("/api/v1/lists/groceries")
+        client.get("/api/v1/lists/groceries/items/")
+
+    records = access_records(caplog)
+    assert len(records) == 2
+    record = records[1]
+    assert record.getMessage() == "GET /api/v1/lists/groceries/items/ 200"
+    assert record.route == "/api/v1/lists/{list_name}/items/"
+    assert record.status == 200
+    assert record.duration_ms >= 0
+
+
+def test_access_log_sampling(client, caplog):
+    """Test that sampled-out successes are dropped while errors are kept"""
+    middleware = client.app.middleware_stack
+    while type(middleware).__name__ != "AccessLogMiddleware":
+        middleware = middleware.app
+    middleware.sample_rate = 0.0
+    try:
+        with caplog.at_level(logging.INFO):
+            client.get("/api/v1/health")
+            client.get("/api/v1/lists/missing/items/")
+    finally:
+        middleware.sample_rate = 1.0
+
+    assert [r.status for r in access_records(caplog)] == [404]
+
+
+def test_access_log_disabled(client, caplog):
+    """Test that nothing is logged when the access logger is disabled"""
+    with caplog.at_level(logging.WARNING):
+        client.get("/api/v1/health")
+    assert access_records(caplog) == []
+
+
+def test_json_formatter():
+    """Test that records render as JSON including their extra fields"""
+    record = logging.LogRecord(
+        "eggs.access", logging.INFO, __file__, 1, "%s done", ("GET",), None
+    )
+    record.status = 200
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["message"] == "GET done"
+    assert entry["level"] == "INFO"
+    assert entry["status"] == 200
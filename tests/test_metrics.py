@@ -0,0 +1,93 @@
+import asyncio
+
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from eggs.metrics import instrument_engine, statement_label
+from tests.test_api import client  # noqa: F401
+from tests.db import db_session, query_counter  # noqa: F401
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_metrics_endpoint(client):
+    """Test that requests are counted per route template and status"""
+    labels = {"method": "GET", "route": "/api/v1/lists/{list_name}/items/"}
+    before_ok = sample("eggs_http_requests_total", status="200", **labels)
+    before_missing = sample("eggs_http_requests_total", status="404", **labels)
+
+    client.post("/api/v1/lists/groceries")
+    client.get("/api/v1/lists/groceries/items/")
+    client.get("/api/v1/lists/other/items/")
+
+    response = client.get("/api/v1/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "eggs_http_request_duration_seconds_bucket" in response.text
+    assert "eggs_http_requests_in_flight" in response.text
+    assert sample("eggs_http_requests_total", status="200", **labels) == before_ok + 1
+    assert (
+        sample("eggs_http_requests_total", status="404", **labels)
+        == before_missing + 1
+    )
+
+
+def test_metrics_unmatched_route(client):
+    """Test that unknown paths share a single label"""
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = sample("eggs_http_requests_total", **labels)
+    client.get("/no/such/path/1")
+    client.get("/no/such/path/2")
+    assert sample("eggs_http_requests_total", **labels) == before + 2
+
+
+def test_statement_label():
+    """Test that IN lists and multi-row VALUES collapse to one label"""
+    assert statement_label("SELECT id\n  FROM items WHERE id IN (?, ?, ?)") == (
+        "SELECT id FROM items WHERE id IN (?)"
+    )
+    assert statement_label("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == (
+        "INSERT INTO t (a, b) VALUES (?)"
+    )
+
+
+def test_statement_label_numbered_placeholders():
+    """Test that asyncpg's numbered placeholders collapse like `?`"""
+    assert statement_label("SELECT id FROM items WHERE id IN ($1, $2, $3)") == (
+        "SELECT id FROM items WHERE id IN (?)"
+    )
+    assert statement_label(
+        "INSERT INTO t (a, b) VALUES ($1::VARCHAR, $2), ($3::VARCHAR, $4)"
+    ) == statement_label("INSERT INTO t (a, b) VALUES ($1::VARCHAR, $2)")
+    assert statement_label("SELECT * FROM t WHERE a = $12 LIMIT $13") == (
+        "SELECT * FROM t WHERE a = ? LIMIT ?"
+    )
+
+
+def test_instrument_engine(tmp_path):
+    """Test that statement durations and pool checkouts are recorded per database"""
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/a.db")
+        other = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/b.db")
+        instrument_engine(engine, "test")
+        instrument_engine(other, "test-other")
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 42"))
+            async with other.connect():
+                assert sample("eggs_db_pool_checked_out", database="test") == 1
+                assert sample("eggs_db_pool_checked_out", database="test-other") == 1
+            assert sample("eggs_db_pool_checked_out", database="test") == 1
+        await engine.dispose()
+        await other.dispose()
+
+    statement = {"statement": "SELECT 42"}
+    checkouts = sample("eggs_db_pool_checkouts_total", database="test")
+    before = sample("eggs_db_query_duration_seconds_count", **statement)
+    asyncio.run(run())
+    assert sample("eggs_db_query_duration_seconds_count", **statement) == before + 1
+    assert sample("eggs_db_pool_checkouts_total", database="test") == checkouts + 1
+    assert sample("eggs_db_pool_checked_out", database="test") == 0
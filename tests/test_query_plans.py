@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from tests.db import db_session, query_counter  # noqa: F401
+from tests.test_api import client  # noqa: F401
+
+
+def exercise_api(client):
+    """Issue every kind of request, so that every query of the API runs."""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping?on_conflict=ignore")
+    client.post("/api/v1/lists/shopping/items/milk")
+    client.post("/api/v1/lists/shopping/items/milk?on_conflict=ignore")
+    client.post("/api/v1/lists/shopping/items", json=["milk", "eggs", "bread"])
+    client.get("/api/v1/lists/")
+    client.get("/api/v1/lists/shopping")
+    client.get("/api/v1/lists/shopping?include=items")
+    client.get("/api/v1/lists/shopping/items/")
+    client.get("/api/v1/lists/shopping/items/milk")
+    client.get("/api/v1/search?q=mil")
+    client.put("/api/v1/lists/shopping/items/milk", json={"is_in_cart": True})
+    client.put("/api/v1/lists/missing/items/milk", json={"is_in_cart": True})
+    client.put(
+        "/api/v1/lists/shopping/items", json={"is_in_cart": True, "names": ["eggs"]}
+    )
+    client.put("/api/v1/lists/shopping/items", json={"is_in_cart": False})
+    client.delete("/api/v1/lists/shopping/items/milk")
+    instance = client.get("/api/v1/lists/shopping/changes?since=0").json()["instance"]
+    client.get(f"/api/v1/lists/shopping/changes?since=1&instance={instance}")
+    client.delete("/api/v1/lists/shopping")
+
+
+@pytest.fixture
+def query_plans(client, db_session, query_counter):
+    """EXPLAIN QUERY PLAN details of every statement the API executed."""
+    exercise_api(client)
+    # Only statements of requests, not those of startup and background tasks
+    served = {
+        statement
+        for _, statements in query_counter.requests
+        for statement in statements
+    }
+    executed = {
+        statement: parameters
+        for statement, parameters in query_counter.executed.items()
+        if statement in served and not statement.startswith(("PRAGMA", "EXPLAIN"))
+    }
+
+    async def explain():
+        connection = await db_session.connection()
+        plans = {}
+        for statement, parameters in executed.items():
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)
+            )
+            plans[" ".join(statement.split())] = [row.detail for row in result]
+        return plans
+
+    return asyncio.run(explain())
+
+
+def test_no_full_table_scans(query_plans):
+    """Test that every query finds its rows through an index"""
+    # SQLite reports full-text lookups as scans of the FTS5 table's index
+    scans = {
+        statement: detail
+        for statement, plan in query_plans.items()
+        for detail in plan
+        if detail.startswith("SCAN")
+        and "CONSTANT ROW" not in detail
+        and "VIRTUAL TABLE INDEX" not in detail
+    }
+    assert scans == {}
+
+
+def test_no_sorting(query_plans):
+    """Test that paginated queries read rows in id order instead of sorting"""
+    sorts = {
+        statement: detail
+        for statement, plan in query_plans.items()
+        for detail in plan
+        if "TEMP B-TREE" in detail
+    }
+    assert sorts == {}
+
+
+def test_keyset_pages_use_index_range(query_plans):
+    """Test that item pages seek to the cursor instead of skipping rows"""
+    (plan,) = [
+        plan
+        for statement, plan in query_plans.items()
+        if statement.startswith("SELECT items.id, items.name FROM items")
+    ]
+    assert plan == ["SEARCH items USING INDEX ix_items_list_id (list_id=? AND rowid>?)"]
+
+
+def test_search_uses_fts_index(query_plans):
+    """Test that search matches and ranks in the FTS5 index, then joins by id"""
+    (plan,) = [
+        plan
+        for statement, plan in query_plans.items()
+        if "items_fts.name MATCH" in statement
+    ]
+    assert plan[0].startswith("SCAN items_fts VIRTUAL TABLE INDEX")
+    assert plan[1:] == [
+        "SEARCH items USING INTEGER PRIMARY KEY (rowid=?)",
+        "SEARCH lists USING INTEGER PRIMARY KEY (rowid=?)",
+    ]
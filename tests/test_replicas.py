@@ -0,0 +1,115 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import insert
+
+from eggs.db import ListModel, create_db_engine, init_db
+from eggs.replicas import STICKY_COOKIE, ReplicaSet
+from tests.db import db_session, query_counter  # noqa: F401
+from tests.test_api import client  # noqa: F401
+
+
+def make_replica(path, *list_names):
+    """Create a SQLite database holding the given lists, to serve as a replica."""
+
+    async def create():
+        engine = create_db_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(init_db)
+            for name in list_names:
+                await conn.execute(insert(ListModel).values(name=name))
+        await engine.dispose()
+
+    asyncio.run(create())
+    return f"sqlite:///{path}"
+
+
+@pytest.fixture
+def replica_set(tmp_path):
+    replica_set = ReplicaSet([make_replica(tmp_path / "replica.db", "from-replica")])
+    with patch("eggs.replicas.replicas", replica_set):
+        yield replica_set
+    asyncio.run(replica_set.engines[0].dispose())
+
+
+def test_pick_round_robin(tmp_path):
+    """Test that replicas take turns and ejected ones are skipped"""
+    replica_set = ReplicaSet([f"sqlite:///{tmp_path}/{n}.db" for n in range(3)])
+    assert [replica_set.pick() for _ in range(4)] == [0, 1, 2, 0]
+
+    replica_set.eject(1)
+    assert [replica_set.pick() for _ in range(3)] == [2, 0, 2]
+
+
+def test_pick_all_ejected(tmp_path):
+    """Test that there is nothing to pick when every replica is ejected"""
+    replica_set = ReplicaSet([f"sqlite:///{tmp_path}/replica.db"])
+    replica_set.eject(0)
+    assert replica_set.pick() is None
+    with patch("eggs.replicas.time.monotonic", return_value=float("inf")):
+        assert replica_set.pick() == 0
+
+
+def test_pick_without_replicas():
+    """Test that nothing is picked when no replicas are configured"""
+    assert ReplicaSet([]).pick() is None
+
+
+def test_reads_go_to_replica(client, replica_set):
+    """Test that read endpoints are served by the replica"""
+    client.post("/api/v1/lists/shopping")
+    client.cookies.clear()
+    assert client.get("/api/v1/lists/").json() == ["from-replica"]
+    assert client.get("/api/v1/lists/from-replica").status_code == 200
+
+
+def test_read_your_writes(client, replica_set):
+    """Test that a client reads a list it changed from the primary"""
+    response = client.post("/api/v1/lists/shopping")
+    assert STICKY_COOKIE in response.cookies
+    assert client.get("/api/v1/lists/").json() == ["shopping"]
+
+    client.cookies.clear()
+    client.post("/api/v1/lists/shopping/items/milk")
+    # Only the changed list is read from the primary
+    assert client.get("/api/v1/lists/shopping/items/").json() == ["milk"]
+    assert client.get("/api/v1/lists/").json() == ["from-replica"]
+
+
+def test_no_sticky_cookie_without_replicas(client):
+    """Test that deployments without replicas set no cookie"""
+    response = client.post("/api/v1/lists/shopping")
+    assert STICKY_COOKIE not in response.cookies
+
+
+def test_failing_replica_is_ejected(client, tmp_path):
+    """Test that a replica that cannot be reached is taken out of rotation"""
+    replica_set = ReplicaSet([f"sqlite:///{tmp_path}/missing/replica.db"])
+    client.post("/api/v1/lists/shopping")
+    client.cookies.clear()
+
+    with patch("eggs.replicas.replicas", replica_set):
+        # The read that finds the replica down is served by the primary
+        assert client.get("/api/v1/lists/").json() == ["shopping"]
+        assert replica_set.pick() is None
+        assert client.get("/api/v1/lists/").json() == ["shopping"]
+
+
+def test_read_moves_on_to_next_replica(client, tmp_path):
+    """Test that a read skips an unreachable replica for a healthy one"""
+    replica_set = ReplicaSet(
+        [
+            f"sqlite:///{tmp_path}/missing/replica.db",
+            make_replica(tmp_path / "replica.db", "from-replica"),
+        ]
+    )
+    client.post("/api/v1/lists/shopping")
+    client.cookies.clear()
+
+    with patch("eggs.replicas.replicas", replica_set):
+        assert client.get("/api/v1/lists/").json() == ["from-replica"]
+        assert client.get("/api/v1/lists/").json() == ["from-replica"]
+    assert replica_set.pick() == 1
+    for engine in replica_set.engines:
+        asyncio.run(engine.dispose())
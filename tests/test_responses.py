@@ -0,0 +1,19 @@
+import json
+from unittest.mock import patch
+
+from eggs.responses import FastJSONResponse
+
+
+def test_render_with_orjson():
+    """Test that responses render compact JSON"""
+    content = {"id": 1, "name": "milk", "items": [True, None]}
+    body = FastJSONResponse(content).body
+    assert json.loads(body) == content
+
+
+def test_render_without_orjson():
+    """Test the standard library fallback when orjson is not installed"""
+    content = ["milk", "eggs"]
+    with patch("eggs.responses.orjson", None):
+        body = FastJSONResponse(content).body
+    assert json.loads(body) == content
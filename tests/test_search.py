@@ -0,0 +1,152 @@
+import asyncio
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from sqlalchemy import update
+
+from eggs.api import MAX_SEARCH_OFFSET, encode_cursor
+from eggs.db import ItemModel
+from eggs.search import fts_query, search_terms
+from tests.db import db_session, query_counter  # noqa: F401
+from tests.test_api import client  # noqa: F401
+from tests.test_shards import dispose, make_shards
+
+
+def search(client, q: str, **params):
+    return client.get("/api/v1/search", params={"q": q, **params})
+
+
+def names(response) -> list[str]:
+    return [item["name"] for item in response.json()]
+
+
+def test_search_terms():
+    """Test that searches are split into words without FTS5 query syntax"""
+    terms = search_terms('Choc* "bread" OR-milk_2')
+    assert terms == ["choc", "bread", "or", "milk", "2"]
+    assert search_terms("* -- !") == []
+    assert fts_query(["choc", "br"]) == '"choc"* "br"*'
+
+
+def test_search_prefixes(client):
+    """Test that every word must start a word of the name, in any list"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/party")
+    client.post(
+        "/api/v1/lists/shopping/items",
+        json=["chocolate bread", "white bread", "milk", "chocolate milk"],
+    )
+    client.post("/api/v1/lists/party/items/hot chocolate")
+
+    response = search(client, "choc")
+    assert response.status_code == 200
+    assert sorted(names(response)) == [
+        "chocolate bread",
+        "chocolate milk",
+        "hot chocolate",
+    ]
+    assert names(search(client, "Choc BR")) == ["chocolate bread"]
+    assert names(search(client, "ocolate")) == []
+    assert search(client, "hot").json() == [
+        {
+            "id": 5,
+            "list_id": 2,
+            "name": "hot chocolate",
+            "is_in_cart": False,
+            "list_name": "party",
+        }
+    ]
+    assert search(client, '"').json() == []
+    assert search(client, "").status_code == 422
+
+
+def test_search_ranking(client):
+    """Test that better matches come first"""
+    client.post("/api/v1/lists/shopping")
+    client.post(
+        "/api/v1/lists/shopping/items",
+        json=["eggs for the big family breakfast", "eggs"],
+    )
+    assert names(search(client, "egg")) == ["eggs", "eggs for the big family breakfast"]
+
+
+def test_search_follows_changes(client, db_session):
+    """Test that the index follows deleted, renamed and cascaded items"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/todo")
+    client.post("/api/v1/lists/shopping/items", json=["milk", "oat milk"])
+    client.post("/api/v1/lists/todo/items/milk the cow")
+    client.put("/api/v1/lists/shopping/items/milk", json={"is_in_cart": True})
+    assert len(names(search(client, "milk"))) == 3
+
+    client.delete("/api/v1/lists/shopping/items/milk")
+    assert sorted(names(search(client, "milk"))) == ["milk the cow", "oat milk"]
+
+    async def rename():
+        await db_session.exec(
+            update(ItemModel).where(ItemModel.name == "oat milk").values(name="oats")
+        )
+        await db_session.commit()
+
+    asyncio.run(rename())
+    assert names(search(client, "milk")) == ["milk the cow"]
+    assert names(search(client, "oats")) == ["oats"]
+
+    client.delete("/api/v1/lists/todo")
+    assert names(search(client, "milk")) == []
+
+
+def test_search_pagination(client):
+    """Test that search results are paginated with a cursor"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=[f"apple {n}" for n in range(5)])
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = search(client, "apple", **params)
+        pages.append(names(response))
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(sum(pages, [])) == [f"apple {n}" for n in range(5)]
+    assert search(client, "apple", cursor="LTE").status_code == 400
+
+
+def test_search_max_offset(client):
+    """Test that search pages end at MAX_SEARCH_OFFSET matches"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/shopping/items", json=[f"apple {n}" for n in range(5)])
+
+    with patch("eggs.api.MAX_SEARCH_OFFSET", 2):
+        response = search(client, "apple", limit=2)
+        assert len(names(response)) == 2
+        response = search(client, "apple", limit=2, cursor=encode_cursor(2))
+        assert len(names(response)) == 2
+        assert "X-Next-Cursor" not in response.headers
+        response = search(client, "apple", limit=2, cursor=encode_cursor(3))
+        assert response.status_code == 400
+    cursor = encode_cursor(MAX_SEARCH_OFFSET + 1)
+    assert search(client, "apple", cursor=cursor).status_code == 400
+    assert search(client, "apple", cursor=encode_cursor(10**30)).status_code == 400
+
+
+def test_search_shards(client, tmp_path):
+    """Test that search merges the matches of all shards"""
+    shard_set = make_shards(tmp_path, 2)
+    with ExitStack() as stack:
+        stack.enter_context(patch("eggs.shards.shards", shard_set))
+        stack.enter_context(patch("eggs.api.shards", shard_set))
+        lists = [f"list-{n}" for n in range(6)]
+        for name in lists:
+            client.post(f"/api/v1/lists/{name}")
+            client.post(f"/api/v1/lists/{name}/items/bread")
+        assert {shard_set.shard_for(name) for name in lists} == {0, 1}
+
+        first = search(client, "bread", limit=4)
+        second = search(client, "bread", cursor=first.headers["X-Next-Cursor"])
+    dispose(shard_set)
+
+    found = [item["list_name"] for item in first.json() + second.json()]
+    assert sorted(found) == lists
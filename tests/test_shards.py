@@ -0,0 +1,180 @@
+import asyncio
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import select
+
+from eggs.api import encode_shard_cursor
+from eggs.db import ItemModel, ListModel, init_db
+from eggs.shards import Move, ShardRing, ShardSet, rebalance
+from tests.db import db_session, query_counter  # noqa: F401
+from tests.test_api import client  # noqa: F401
+
+NAMES = [f"list-{n}" for n in range(2000)]
+
+
+def make_shards(tmp_path, count: int) -> ShardSet:
+    """Create `count` empty SQLite shards."""
+    shard_set = ShardSet([f"sqlite:///{tmp_path}/shard-{n}.db" for n in range(count)])
+
+    async def create():
+        for engine in shard_set.engines:
+            async with engine.begin() as conn:
+                await conn.run_sync(init_db)
+
+    asyncio.run(create())
+    return shard_set
+
+
+def dispose(shard_set: ShardSet) -> None:
+    async def dispose_all():
+        for engine in shard_set.engines:
+            await engine.dispose()
+
+    asyncio.run(dispose_all())
+
+
+async def lists_on(shard_set: ShardSet, shard: int) -> dict[str, list[str]]:
+    """Return the lists on a shard with the names of their items."""
+    async with shard_set.sessions[shard]() as db:
+        lists = (await db.exec(select(ListModel))).all()
+        return {
+            list_obj.name: list(
+                (
+                    await db.exec(
+                        select(ItemModel.name).where(ItemModel.list_id == list_obj.id)
+                    )
+                ).all()
+            )
+            for list_obj in lists
+        }
+
+
+@pytest.fixture
+def shard_set(tmp_path):
+    shard_set = make_shards(tmp_path, 2)
+    with ExitStack() as stack:
+        stack.enter_context(patch("eggs.shards.shards", shard_set))
+        stack.enter_context(patch("eggs.api.shards", shard_set))
+        yield shard_set
+    dispose(shard_set)
+
+
+def test_ring_is_stable_and_balanced():
+    """Test that names always map to the same shard and shards get similar shares"""
+    ring = ShardRing(4)
+    assignments = [ring.shard_for(name) for name in NAMES]
+    assert assignments == [ShardRing(4).shard_for(name) for name in NAMES]
+    for shard in range(4):
+        assert 0.15 < assignments.count(shard) / len(NAMES) < 0.35
+
+
+def test_ring_adding_shard_moves_few_names():
+    """Test that a new shard only takes names, about 1/n of them"""
+    before, after = ShardRing(4), ShardRing(5)
+    moved = [name for name in NAMES if before.shard_for(name) != after.shard_for(name)]
+    assert all(after.shard_for(name) == 4 for name in moved)
+    assert 0.1 < len(moved) / len(NAMES) < 0.3
+
+
+def test_lists_are_routed_to_shards(client, shard_set):
+    """Test that each list and its items live on the shard its name hashes to"""
+    names = ["shopping", "todo", "hardware", "party", "camping", "garden"]
+    for name in names:
+        assert client.post(f"/api/v1/lists/{name}").status_code == 200
+        client.post(f"/api/v1/lists/{name}/items", json=["milk", "eggs"])
+        client.put(f"/api/v1/lists/{name}/items/milk", json={"is_in_cart": True})
+        client.delete(f"/api/v1/lists/{name}/items/eggs")
+
+    for shard in range(2):
+        on_shard = asyncio.run(lists_on(shard_set, shard))
+        expected = {n for n in names if shard_set.shard_for(n) == shard}
+        assert set(on_shard) == expected
+        assert all(items == ["milk"] for items in on_shard.values())
+
+    response = client.get("/api/v1/lists/shopping/items/milk")
+    assert response.json()["is_in_cart"] is True
+    assert client.delete("/api/v1/lists/shopping").status_code == 200
+    assert client.get("/api/v1/lists/shopping").status_code == 404
+
+
+def test_read_lists_merges_shards(client, shard_set):
+    """Test that the list pages merge all shards and paginate across them"""
+    names = [f"list-{n}" for n in range(7)]
+    for name in names:
+        client.post(f"/api/v1/lists/{name}")
+    assert {shard_set.shard_for(name) for name in names} == {0, 1}
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/lists/", params=params)
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sorted(sum(pages, [])) == sorted(names)
+
+
+def test_read_lists_invalid_shard_cursor(client, shard_set):
+    """Test that cursors that are not per-shard cursors are rejected"""
+    for cursor in ["!!!", "MQ", encode_shard_cursor([0, 2**63])]:
+        response = client.get("/api/v1/lists/", params={"cursor": cursor})
+        assert response.status_code == 400
+
+
+def test_rebalance(tmp_path):
+    """Test that adding a shard moves the lists that hash to it, and only those"""
+    old = make_shards(tmp_path, 2)
+
+    async def populate():
+        for n in range(20):
+            name = f"list-{n}"
+            async with old.sessions[old.shard_for(name)]() as db:
+                list_obj = ListModel(name=name, version=3)
+                db.add(list_obj)
+                await db.flush()
+                db.add(
+                    ItemModel(
+                        list_id=list_obj.id, name="milk", is_in_cart=True, version=2
+                    )
+                )
+                await db.commit()
+
+    asyncio.run(populate())
+    dispose(old)
+    new = make_shards(tmp_path, 3)
+
+    planned = asyncio.run(rebalance(new, dry_run=True))
+    assert planned
+    assert all(move.target == 2 for move in planned)
+    assert asyncio.run(lists_on(new, 2)) == {}
+
+    async def instance(shard: int, name: str) -> int:
+        async with new.sessions[shard]() as db:
+            statement = select(ListModel.instance).where(ListModel.name == name)
+            return (await db.exec(statement)).one()
+
+    instance_before = asyncio.run(instance(planned[0].source, planned[0].name))
+    assert asyncio.run(rebalance(new)) == planned
+    assert asyncio.run(instance(planned[0].target, planned[0].name)) != instance_before
+    assert asyncio.run(rebalance(new)) == []
+    for shard in range(3):
+        on_shard = asyncio.run(lists_on(new, shard))
+        assert all(new.shard_for(name) == shard for name in on_shard)
+        assert all(items == ["milk"] for items in on_shard.values())
+    assert sum(len(asyncio.run(lists_on(new, shard))) for shard in range(3)) == 20
+
+    async def moved_versions(move: Move) -> tuple[int, int, int]:
+        async with new.sessions[move.target]() as db:
+            list_obj = (
+                await db.exec(select(ListModel).where(ListModel.name == move.name))
+            ).one()
+            item = (await db.exec(select(ItemModel))).first()
+            return list_obj.version, list_obj.compacted_version, item.version
+
+    # Clients that synced the list before the move must fetch it again
+    assert asyncio.run(moved_versions(planned[0])) == (3, 3, 2)
+    dispose(new)
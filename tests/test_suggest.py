@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from eggs.db import ItemModel, ListModel
+from eggs.suggest import SuggestionTrie, rebuild, suggestions
+from tests.db import db_session, query_counter  # noqa: F401
+from tests.test_api import client  # noqa: F401
+
+
+def make_trie(*names: str, **kwargs) -> SuggestionTrie:
+    trie = SuggestionTrie(**kwargs)
+    for name in names:
+        trie.add(name)
+    return trie
+
+
+def test_suggest_by_frequency():
+    """Test that names are suggested by prefix, most frequent first"""
+    trie = make_trie("Milk", "mint", "milk", "Milk", "mince", "mint", "eggs")
+    assert trie.suggest("m") == ["Milk", "mint", "mince"]
+    assert trie.suggest("MI", limit=2) == ["Milk", "mint"]
+    assert trie.suggest("min") == ["mint", "mince"]
+    assert trie.suggest("milky") == []
+    assert trie.suggest("x") == []
+
+
+def test_suggest_top_k():
+    """Test that a name that becomes frequent enough enters the top k"""
+    trie = make_trie("apple", "apple", "avocado", "avocado", "apricot", top_k=2)
+    assert trie.suggest("a") == ["apple", "avocado"]
+    trie.add("apricot")
+    trie.add("apricot")
+    assert trie.suggest("a") == ["apricot", "apple"]
+    assert trie.suggest("ap") == ["apricot", "apple"]
+
+
+def test_suggest_remove():
+    """Test that removed names drop in rank, and out when no item has them"""
+    trie = make_trie(*["tea"] * 4, *["tomato"] * 3, "tofu", "tofu", "toast", top_k=2)
+    assert trie.suggest("t") == ["tea", "tomato"]
+
+    trie.remove("Tea")
+    assert trie.suggest("te") == ["tea"]
+    for _ in range(3):
+        trie.remove("tea")
+    assert trie.suggest("t") == ["tomato", "tofu"]
+    assert trie.suggest("te") == []
+    assert len(trie) == 3
+
+    for _ in range(3):
+        trie.remove("tomato")
+    trie.remove("unknown")
+    assert trie.suggest("to") == ["tofu", "toast"]
+    assert "e" not in trie._root.children["t"].children
+
+
+def test_suggest_remove_promotes():
+    """Test that a name drops out of the top k once another outranks it"""
+    trie = make_trie(*["ab"] * 3, *["ac"] * 3, "ad", "ad", top_k=2)
+    assert trie.suggest("a") == ["ab", "ac"]
+    trie.remove("ab")
+    trie.remove("ab")
+    assert trie.suggest("a") == ["ac", "ad"]
+
+
+def test_suggest_max_names():
+    """Test that new names are ignored once the trie is full"""
+    trie = make_trie("bread", "butter", "beans", max_names=2)
+    assert trie.suggest("b") == ["bread", "butter"]
+    trie.add("bread")
+    trie.remove("butter")
+    trie.add("beans")
+    assert trie.suggest("b") == ["bread", "beans"]
+
+
+def test_suggest_replace():
+    """Test loading names that come most frequent first"""
+    trie = make_trie("old")
+    trie.replace([("Salt", 5), ("sugar", 3), ("salt", 2), ("soap", 1)])
+    assert trie.suggest("s") == ["Salt", "sugar", "soap"]
+    assert trie.suggest("o") == []
+    trie.add("soap")
+    trie.add("soap")
+    trie.add("soap")
+    assert trie.suggest("s") == ["Salt", "soap", "sugar"]
+
+
+def test_suggest_lookup_speed():
+    """Test that lookups in a full trie take well under a millisecond"""
+    trie = SuggestionTrie()
+    trie.replace((f"item {n}", 10000 - n) for n in range(10000))
+    start = time.perf_counter()
+    for _ in range(1000):
+        trie.suggest("item 1")
+    assert (time.perf_counter() - start) / 1000 < 0.0005
+
+
+def test_rebuild(db_session):
+    """Test that the trie is built from the names of all items"""
+
+    async def populate():
+        async with db_session.bind.begin() as conn:
+            await conn.execute(insert(ListModel), [{"name": "a"}, {"name": "b"}])
+            await conn.execute(
+                insert(ItemModel),
+                [
+                    {"list_id": 1, "name": "Eggs", "is_in_cart": False},
+                    {"list_id": 2, "name": "eggs", "is_in_cart": False},
+                    {"list_id": 1, "name": "espresso", "is_in_cart": False},
+                    {"list_id": 2, "name": "milk", "is_in_cart": False},
+                ],
+            )
+
+    asyncio.run(populate())
+    factory = async_sessionmaker(db_session.bind, class_=AsyncSession)
+    trie = SuggestionTrie(max_names=2)
+    asyncio.run(rebuild(trie, [factory]))
+    assert trie.suggest("e") == ["Eggs"]
+    assert len(trie) == 2
+
+
+def test_suggest_api(client, query_counter):
+    """Test that suggestions follow item changes without querying the database"""
+    client.post("/api/v1/lists/shopping")
+    client.post("/api/v1/lists/party")
+    client.post("/api/v1/lists/shopping/items", json=["Milk", "mints"])
+    client.post("/api/v1/lists/party/items/milk")
+    client.post("/api/v1/lists/party/items/mineral water")
+
+    with query_counter.assert_max_queries(0):
+        response = client.get("/api/v1/suggest", params={"prefix": "mi"})
+    assert response.json() == ["Milk", "mints", "mineral water"]
+
+    client.delete("/api/v1/lists/shopping/items/mints")
+    assert client.get("/api/v1/suggest?prefix=mi&limit=2").json() == [
+        "Milk",
+        "mineral water",
+    ]
+    assert suggestions.suggest("mints") == []
+    assert client.get("/api/v1/suggest?prefix=").status_code == 422
+    assert client.get("/api/v1/suggest?prefix=m&limit=11").status_code == 422